@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import sys
+import csv
+import time
+import json
+import argparse
+import itertools
+import multiprocessing
+from scrabble import Scrabble, CONFIG_FILE, DICTIONARY_FILE
+from rules import Rules
+from rack import Rack, TILE_INDEX
+
+# global variables
+CHUNK_SIZE = 16
+
+# per-process worker state: the rules positions are analyzed under, inherited when the pool starts
+_worker = {'rules': None, 'top': None}
+
+
+# return letters of a rack given as a list of tiles or a string of letters, '?' for a blank. ValueError if
+# it holds anything else
+def getRackLetters(rack):
+	if isinstance(rack, basestring):
+		letters = ['blank' if l == '?' else l for l in rack.strip().lower()]
+	elif isinstance(rack, (list, tuple)):
+		letters = [l for l in rack if isinstance(l, basestring)]
+		if len(letters) != len(rack):
+			raise ValueError('rack tiles are not strings')
+		letters = [str(l) for l in letters]
+	else:
+		raise ValueError('rack is not a string or a list')
+	for l in letters:
+		if l not in TILE_INDEX:
+			raise ValueError('invalid tile in rack: ' + l)
+	return letters
+
+
+# return a game under rules set up at position, a dict holding words (words in play, as in the config file)
+# and rack: the board holds the words, the player to move the rack, and the bag every other tile. ValueError
+# if the position cannot be set up
+def setupPosition(rules, position):
+	scrabble = Scrabble(1, rules=rules)
+	# the rack drawn for the new game goes back, the tiles of the position come out of the bag instead
+	rack = scrabble.player_data[scrabble.player]['rack']
+	scrabble.bag.insert(rack.letters())
+	words_in_play = position.get('words') or ''
+	if words_in_play:
+		scrabble._addWordsInPlay(str(words_in_play))
+	letters = getRackLetters(position.get('rack') or '')
+	scrabble._reduceLetters(letters)
+	scrabble.player_data[scrabble.player]['rack'] = Rack(letters)
+	return scrabble
+
+
+# return analysis of position (as setupPosition takes it): the optimal points and words, and with top the
+# top moves. the id of position is passed through if present
+def analyzePosition(rules, position, top=None):
+	result = {}
+	if 'id' in position: result['id'] = position['id']
+	try:
+		scrabble = setupPosition(rules, position)
+	except ValueError as e:
+		result['error'] = 'invalid position: ' + str(e)
+		return result
+	optimalMap = scrabble.getOptimalMove()
+	result['points'] = optimalMap['points']
+	result['words'] = optimalMap['words']
+	if top:
+		result['moves'] = scrabble.getTopMoves(top)
+	return result
+
+
+# set rules of a worker process, once when the pool starts
+def _initWorker(rules, top):
+	_worker['rules'] = rules
+	_worker['top'] = top
+
+
+# analyze one task: (line number, position as a dict or a JSON line)
+def _analyzeTask(task):
+	line, position = task
+	if isinstance(position, basestring):
+		try:
+			position = json.loads(position)
+			if not isinstance(position, dict):
+				raise ValueError('position is not an object')
+		except ValueError as e:
+			return {'line': line, 'error': 'invalid position: ' + str(e)}
+	result = analyzePosition(_worker['rules'], position, _worker['top'])
+	result['line'] = line
+	return result
+
+
+# yield (line number, position) of every position of a JSON lines or CSV (with a header row) input
+def readPositions(input_file, format):
+	if format == 'csv':
+		reader = csv.DictReader(input_file)
+		for row in reader:
+			yield reader.line_num, row
+		return
+	for line, text in enumerate(input_file, 1):
+		if text.strip():
+			yield line, text
+
+
+class Analyzer:
+	'''
+	Batch analysis of positions under one set of rules: the lexicon is loaded once, and every position is set
+	up on a fresh game (board from its words in play, rack) without going through a config file. Positions are
+	analyzed across a process pool, in chunks of CHUNK_SIZE, and results come back in input order as they
+	finish; with one process, positions are analyzed here.
+	'''
+
+	def __init__(self, rules, processes=None, top=None):
+		self.rules = rules
+		self.processes = processes
+		self.top = top
+		self.count = 0
+		self.errors = 0
+
+
+	# yield result of every (line number, position) of positions, in order
+	def iterResults(self, positions):
+		_initWorker(self.rules, self.top)
+		if self.processes == 1:
+			results = itertools.imap(_analyzeTask, positions)
+			for result in results:
+				yield self._count(result)
+			return
+		pool = multiprocessing.Pool(self.processes, _initWorker, (self.rules, self.top))
+		try:
+			for result in pool.imap(_analyzeTask, positions, CHUNK_SIZE):
+				yield self._count(result)
+			pool.close()
+		except:
+			pool.terminate()
+			raise
+		finally:
+			pool.join()
+
+
+	# count result of one position
+	def _count(self, result):
+		self.count += 1
+		if 'error' in result: self.errors += 1
+		return result
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='find the optimal move of many positions')
+	parser.add_argument('input', nargs='?', default='-', help='JSON lines or CSV positions, with words and rack fields (default: stdin)')
+	parser.add_argument('-o', '--output', default='-', help='JSON lines output file (default: stdout)')
+	parser.add_argument('-f', '--format', choices=('jsonl', 'csv'), default=None, help='input format (default: from the file extension, else jsonl)')
+	parser.add_argument('-p', '--processes', type=int, default=None, help='worker processes (default: all cores)')
+	parser.add_argument('-t', '--top', type=int, default=None, help='also list the top moves of each position')
+	parser.add_argument('--config', default=CONFIG_FILE, help='config file')
+	parser.add_argument('--dictionary', default=DICTIONARY_FILE, help='dictionary file')
+	args = parser.parse_args()
+
+	format = args.format or ('csv' if args.input.endswith('.csv') else 'jsonl')
+	input_file = sys.stdin if args.input == '-' else open(args.input)
+	output = sys.stdout if args.output == '-' else open(args.output, 'w')
+	analyzer = Analyzer(Rules.fromFile(args.config, args.dictionary), args.processes, args.top)
+	start = time.time()
+	try:
+		for result in analyzer.iterResults(readPositions(input_file, format)):
+			output.write(json.dumps(result, sort_keys=True) + '\n')
+	finally:
+		if input_file is not sys.stdin: input_file.close()
+		if output is not sys.stdout: output.close()
+	seconds = time.time() - start
+	sys.stderr.write(str(analyzer.count) + ' positions in ' + ('%.1f' % seconds) + 's (' + ('%.1f' % (analyzer.count / max(seconds, 1e-9))) + ' positions/s), ' + str(analyzer.errors) + ' errors\n')
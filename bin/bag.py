@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import random
+from rack import TILES, TILE_INDEX
+
+
+class Bag:
+	'''
+	Tiles left to draw, each tile one entry of a list, drawn with the bag's own random.Random.
+
+	A draw picks a random entry and swaps the last one into its place, so it is O(1) and every tile is equally
+	likely: letters come out in proportion to their copies left. Without a seed the bag is seeded from the
+	random module, so random.seed() still fixes the draws of games that don't pass one. snapshot() captures
+	the tiles and random state, and restore() brings both back, so draws after a restore repeat exactly. Draws
+	saved to a journal are taken back by undraw() the same way, without copying the tiles.
+	'''
+
+	def __init__(self, tiles=(), seed=None):
+		if seed is None:
+			seed = random.getrandbits(64)
+		self.random = random.Random(seed)
+		self.tiles = list(tiles)
+		self.counts = [0] * len(TILES)
+		for l in self.tiles:
+			self.counts[TILE_INDEX[l]] += 1
+
+
+	# return bag holding count copies of each letter of letters_count, in TILES order
+	@classmethod
+	def fromCounts(cls, letters_count, seed=None):
+		tiles = []
+		for l in TILES:
+			tiles.extend([l] * letters_count.get(l, 0))
+		return cls(tiles, seed)
+
+
+	# draw one random tile, None if bag is empty. if journal (a list) is given, the draw is saved to it for undraw
+	def draw(self, journal=None):
+		if not self.tiles:
+			return None
+		i = self.random.randrange(len(self.tiles))
+		tiles = self.tiles
+		tiles[i], tiles[-1] = tiles[-1], tiles[i]
+		l = tiles.pop()
+		self.counts[TILE_INDEX[l]] -= 1
+		if journal is not None: journal.append((i, l))
+		return l
+
+
+	# put back the tiles of draws saved to journal, and the random state before them
+	def undraw(self, journal, state):
+		tiles = self.tiles
+		for i, l in reversed(journal):
+			tiles.append(l)
+			tiles[i], tiles[-1] = tiles[-1], tiles[i]
+			self.counts[TILE_INDEX[l]] += 1
+		self.random.setstate(state)
+
+
+	# put tiles back in the bag
+	def insert(self, tiles):
+		for l in tiles:
+			self.tiles.append(l)
+			self.counts[TILE_INDEX[l]] += 1
+
+
+	# take given tiles out of the bag (tiles placed from a config), ValueError if one is not in the bag
+	def remove(self, tiles):
+		for l in tiles:
+			if not self.count(l):
+				raise ValueError('letter not in bag: ' + str(l))
+			self.tiles.remove(l)
+			self.counts[TILE_INDEX[l]] -= 1
+
+
+	# return number of copies of letter left in bag
+	def count(self, letter):
+		if letter not in TILE_INDEX:
+			return 0
+		return self.counts[TILE_INDEX[letter]]
+
+
+	# return letters left in bag, in TILES order
+	def letters(self):
+		letters = []
+		for i, count in enumerate(self.counts):
+			letters.extend([TILES[i]] * count)
+		return letters
+
+
+	# return state of the bag: its tiles and random state
+	def snapshot(self):
+		return tuple(self.tiles), self.random.getstate()
+
+
+	# set bag back to a state returned by snapshot
+	def restore(self, snapshot):
+		tiles, state = snapshot
+		self.tiles = list(tiles)
+		self.counts = [0] * len(TILES)
+		for l in self.tiles:
+			self.counts[TILE_INDEX[l]] += 1
+		self.random.setstate(state)
+
+
+	def __len__(self):
+		return len(self.tiles)
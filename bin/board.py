@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import random
+from array import array
+
+# global variables
+DOWN = 'down'
+ACROSS = 'across'
+EMPTY = 0
+ZOBRIST_SEED = 0x5c4abb1e
+
+# zobrist keys per number of squares, shared by every board of that size
+_zobrist = {}
+
+
+# convert 'row-col' tile to square index on a board of board_size, None if outside the board
+def tileToIndex(tile, board_size):
+	row, col = tile.split('-')
+	row, col = int(row), int(col)
+	if row < 0 or row >= board_size or col < 0 or col >= board_size:
+		return None
+	return row * board_size + col
+
+
+# return zobrist keys for a board of squares: one per letter on each square, and one per square holding a blank
+def getZobristKeys(squares):
+	if squares not in _zobrist:
+		rng = random.Random(ZOBRIST_SEED + squares)
+		letter_keys = [rng.getrandbits(64) for i in range(0, squares * 26)]
+		blank_keys = [rng.getrandbits(64) for i in range(0, squares)]
+		_zobrist[squares] = (letter_keys, blank_keys)
+	return _zobrist[squares]
+
+
+class Board:
+	'''
+	Board squares addressed by flat index (row * size + col).
+
+	letters holds the ord() of the letter on each square (EMPTY if none) and points the face value of the tile
+	placed there (0 for a blank). letter_multiplier and word_multiplier are the premium squares precomputed per
+	index, shared with the rules, so scoring never has to search the premium lists. Tiles as 'row-col' strings
+	are only used at the edges.
+
+	hash is the Zobrist hash of the tiles on the board (0 when empty), updated as tiles are placed: boards
+	holding the same letters, with blanks on the same squares, hash the same however they got there. unplace
+	takes a tile back off, restoring the hash.
+	'''
+
+	def __init__(self, rules):
+		self.size = rules.board_size
+		self.squares = self.size * self.size
+		self.step = {ACROSS: 1, DOWN: self.size}
+		self.center = rules.center
+		self.letter_multiplier = rules.letter_multiplier
+		self.word_multiplier = rules.word_multiplier
+		self.letters = bytearray(self.squares)
+		self.points = array('B', [0] * self.squares)
+		self.tile_count = 0
+		self.hash = 0
+		self._letter_keys, self._blank_keys = getZobristKeys(self.squares)
+
+
+	# convert 'row-col' tile to square index, None if outside board size
+	def getIndex(self, tile):
+		return tileToIndex(tile, self.size)
+
+
+	# convert square index to 'row-col' tile
+	def getTile(self, square):
+		return str(square // self.size) + '-' + str(square % self.size)
+
+
+	# return square length steps away in direction, None if outside board size
+	def getPosition(self, square, length, direction):
+		if direction == ACROSS:
+			col = square % self.size + length
+			if col < 0 or col >= self.size:
+				return None
+			return square + length
+		row = square // self.size + length
+		if row < 0 or row >= self.size:
+			return None
+		return square + length * self.size
+
+
+	# return letter on square, None if empty
+	def getLetter(self, square):
+		if self.letters[square] == EMPTY:
+			return None
+		return chr(self.letters[square])
+
+
+	# put a tile worth points on square
+	def place(self, square, letter, points):
+		self.letters[square] = ord(letter)
+		self.points[square] = points
+		self.tile_count += 1
+		self.hash ^= self._letter_keys[square * 26 + ord(letter) - ord('a')]
+		# a tile worth nothing scores as a blank
+		if not points:
+			self.hash ^= self._blank_keys[square]
+
+
+	# take the tile off square, undoing place
+	def unplace(self, square):
+		letter = self.letters[square]
+		self.hash ^= self._letter_keys[square * 26 + letter - ord('a')]
+		if not self.points[square]:
+			self.hash ^= self._blank_keys[square]
+		self.letters[square] = EMPTY
+		self.points[square] = 0
+		self.tile_count -= 1
+
+
+	# return squares of one line in direction (a row for ACROSS, a column for DOWN)
+	def getLine(self, line, direction):
+		if direction == ACROSS:
+			return range(line * self.size, (line + 1) * self.size)
+		return range(line, self.squares, self.size)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+from board import ACROSS, DOWN
+
+
+class CrossChecks:
+	'''
+	Per-board cache of what every empty square allows, kept up to date as tiles are placed.
+
+	For each square and direction of play, allowed holds the letters that keep the perpendicular side word
+	valid (None when the square has no side neighbours, so any letter fits) and side_points holds the face
+	value of the side word's existing tiles. anchors flags the empty squares that touch a tile. Squares are
+	board indexes; placing tiles only recomputes the squares at the ends of the runs through the new tiles.
+	'''
+
+	def __init__(self, lexicon, board):
+		self.lexicon = lexicon
+		self.board = board
+		self.allowed = {ACROSS: [None] * board.squares, DOWN: [None] * board.squares}
+		self.side_points = {ACROSS: [0] * board.squares, DOWN: [0] * board.squares}
+		self.anchors = bytearray(board.squares)
+
+
+	# update cache around newly placed tiles, given as square indexes. if journal (a list) is given, the
+	# entries changed are saved to it first, for undo
+	def update(self, placed, journal=None):
+		board = self.board
+		dirty = {ACROSS: set(), DOWN: set()}
+		for square in placed:
+			if journal is not None: self._save(journal, square)
+			self.anchors[square] = 0
+			for direction in (ACROSS, DOWN):
+				self.allowed[direction][square] = None
+				self.side_points[direction][square] = 0
+				for step in (-1, 1):
+					neighbour = board.getPosition(square, step, direction)
+					if neighbour is not None and not board.letters[neighbour]:
+						if journal is not None: self._save(journal, neighbour)
+						self.anchors[neighbour] = 1
+			# ends of the down run get new across cross-checks, ends of the across run new down cross-checks
+			dirty[ACROSS].update(self._getRunEnds(square, DOWN))
+			dirty[DOWN].update(self._getRunEnds(square, ACROSS))
+		for direction in dirty:
+			for square in dirty[direction]:
+				if journal is not None: self._save(journal, square)
+				self._computeSquare(square, direction)
+
+
+	# restore entries saved to journal by update, once the tiles it placed are taken back off the board
+	def undo(self, journal):
+		for square, anchor, allowed_across, points_across, allowed_down, points_down in reversed(journal):
+			self.anchors[square] = anchor
+			self.allowed[ACROSS][square] = allowed_across
+			self.side_points[ACROSS][square] = points_across
+			self.allowed[DOWN][square] = allowed_down
+			self.side_points[DOWN][square] = points_down
+
+
+	# save entries of square to journal
+	def _save(self, journal, square):
+		journal.append((square, self.anchors[square], self.allowed[ACROSS][square], self.side_points[ACROSS][square], self.allowed[DOWN][square], self.side_points[DOWN][square]))
+
+
+	# return empty squares just before and after the run of tiles through square in direction
+	def _getRunEnds(self, square, direction):
+		board = self.board
+		ends = []
+		for step in (-1, 1):
+			end = square
+			while end is not None and board.letters[end]:
+				end = board.getPosition(end, step, direction)
+			if end is not None:
+				ends.append(end)
+		return ends
+
+
+	# recompute allowed letters and side points of an empty square for plays in direction
+	def _computeSquare(self, square, direction):
+		board = self.board
+		if direction == ACROSS: side = DOWN
+		else: side = ACROSS
+		points = 0
+		before = ''
+		pos = board.getPosition(square, -1, side)
+		while pos is not None and board.letters[pos]:
+			before = chr(board.letters[pos]) + before
+			points += board.points[pos]
+			pos = board.getPosition(pos, -1, side)
+		after = ''
+		pos = board.getPosition(square, 1, side)
+		while pos is not None and board.letters[pos]:
+			after += chr(board.letters[pos])
+			points += board.points[pos]
+			pos = board.getPosition(pos, 1, side)
+		self.side_points[direction][square] = points
+		if not before and not after:
+			self.allowed[direction][square] = None
+			return
+		allowed = set()
+		prefix = self.lexicon.follow(before)
+		if prefix:
+			for letter, child, terminal in self.lexicon.children(prefix[0]):
+				if not after:
+					if terminal: allowed.add(letter)
+					continue
+				suffix = self.lexicon.follow(after, child)
+				if suffix and suffix[1]:
+					allowed.add(letter)
+		self.allowed[direction][square] = frozenset(allowed)
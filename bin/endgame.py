@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import time
+from scrabble import SCORELESS_LIMIT
+
+# global variables
+TIME_LIMIT = 5.0
+TABLE_SIZE = 1 << 18
+INFINITY = 1 << 30
+
+# transposition table bounds: the value stored is exact, at least (lower) or at most (upper) the true value
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class _Timeout(Exception):
+	pass
+
+
+class EndgameSolver:
+	'''
+	Endgame search of a two player game whose bag is empty: both racks are known, so the rest of the game is
+	a perfect information game.
+
+	Iterative-deepening negamax with alpha-beta. A node's value is the spread the player to move gains from
+	there on: their points minus the opponent's, plus the rack penalties once the game ends (a player going out
+	gets twice the points left on the other rack; after scoreless_limit scoreless turns each loses their own).
+	Past the search depth, positions are valued at the rack points of the opponent minus those of the player to
+	move. Moves come from the move generator, highest points first, the best move of the last iteration first,
+	and passing last. Moves and values are kept in a transposition table keyed by the board hash, both rack
+	signatures and the scoreless turns, holding up to TABLE_SIZE positions. Moves are played with applyMove and
+	applyPass and taken back with undoMove, so the game is left as it was.
+
+	Deepening stops once the value is exact (no position was cut off by the search depth) or time_limit
+	seconds have passed; the result of the last complete iteration stands. Positions searched to the end of
+	the game keep their value in the table for every later iteration.
+	'''
+
+	def __init__(self, scrabble, time_limit=TIME_LIMIT, scoreless_limit=SCORELESS_LIMIT):
+		if scrabble.player_size != 2:
+			raise ValueError('endgames are solved for two players')
+		if len(scrabble.bag):
+			raise ValueError('bag is not empty')
+		self.scrabble = scrabble
+		self.time_limit = time_limit
+		self.scoreless_limit = scoreless_limit
+		self.nodes = 0
+		self._table = {}
+		self._moves = {}
+		self._deadline = None
+		self._exact = True
+
+
+	# return the best line of the player to move: spread (final score of the player to move minus the
+	# opponent's, at the end of the line), moves (each as iterMoves gives it, None for a pass, players
+	# alternating from the player to move), depth searched, whether the result is exact, and nodes searched
+	def solve(self, max_depth=None):
+		scrabble = self.scrabble
+		self.nodes = 0
+		self._deadline = None if self.time_limit is None else time.time() + self.time_limit
+		player = scrabble.player
+		opponent = scrabble.player_list[1 - scrabble.player_index]
+		spread = scrabble.player_data[player]['score'] - scrabble.player_data[opponent]['score']
+		result = None
+		depth = 0
+		while max_depth is None or depth < max_depth:
+			depth += 1
+			self._exact = True
+			try:
+				value = self._search(depth, -INFINITY, INFINITY)
+			except _Timeout:
+				break
+			result = {'spread': spread + value, 'moves': self._getLine(depth), 'depth': depth, 'exact': self._exact}
+			if self._exact:
+				break
+		# out of time before a first iteration: the move ordered first
+		if result is None:
+			move = self._getMoves()[0]
+			points = 0 if move is None else move[0]
+			result = {'spread': spread + points, 'moves': [move], 'depth': 0, 'exact': False}
+		result['nodes'] = self.nodes
+		return result
+
+
+	# return value of the position to move, searching depth moves ahead within the alpha-beta window
+	def _search(self, depth, alpha, beta):
+		self.nodes += 1
+		if self._deadline is not None and time.time() > self._deadline:
+			raise _Timeout()
+		scrabble = self.scrabble
+		rack_points = self._getRackPoints(scrabble.player)
+		opponent = scrabble.player_list[1 - scrabble.player_index]
+		opponent_points = self._getRackPoints(opponent)
+		# the opponent went out, or the game ended on scoreless turns
+		if not len(scrabble.player_data[opponent]['rack']):
+			return -2 * rack_points
+		if scrabble.scoreless_turns >= self.scoreless_limit:
+			return opponent_points - rack_points
+		key = self._getKey()
+		entry = self._table.get(key)
+		best_move = None
+		if entry is not None:
+			entry_depth, bound, value, best_move, exact = entry
+			if entry_depth >= depth and (bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha)):
+				if not exact: self._exact = False
+				return value
+		moves = self._getMoves()
+		if entry is not None:
+			moves = [best_move] + [move for move in moves if move != best_move]
+		alpha_start = alpha
+		best = -INFINITY
+		exact = self._exact
+		self._exact = True
+		for move in moves:
+			points = 0 if move is None else move[0]
+			if depth == 1:
+				value = points - self._getLeafValue(move, rack_points, opponent_points)
+			else:
+				self._applyMove(move)
+				try:
+					value = points - self._search(depth - 1, points - beta, points - alpha)
+				finally:
+					scrabble.undoMove()
+			if value > best:
+				best = value
+				best_move = move
+			if best > alpha:
+				alpha = best
+			if alpha >= beta:
+				break
+		if best <= alpha_start: bound = UPPER
+		elif best >= beta: bound = LOWER
+		else: bound = EXACT
+		# values of positions searched to the end of the game hold at any depth
+		if self._exact: depth = INFINITY
+		if len(self._table) >= TABLE_SIZE:
+			self._table.clear()
+		self._table[key] = (depth, bound, best, best_move, self._exact)
+		self._exact = exact and self._exact
+		return best
+
+
+	# return value of the position after move for the player to move then, without playing it
+	def _getLeafValue(self, move, rack_points, opponent_points):
+		scrabble = self.scrabble
+		if move is None:
+			left = rack_points
+			scoreless = scrabble.scoreless_turns + 1
+		else:
+			# going out ends the game
+			if len(move[4]) == len(scrabble.player_data[scrabble.player]['rack']):
+				return -2 * opponent_points
+			left = rack_points - sum(scrabble.letters_points[l] for l in move[4])
+			scoreless = 0 if move[0] else scrabble.scoreless_turns + 1
+		if scoreless < self.scoreless_limit:
+			self._exact = False
+		return left - opponent_points
+
+
+	# return moves of the player to move, highest points first (ties in search order), then passing
+	def _getMoves(self):
+		scrabble = self.scrabble
+		rack = scrabble.player_data[scrabble.player]['rack']
+		key = (scrabble.board.hash, rack.signature)
+		moves = self._moves.get(key)
+		if moves is None:
+			moves = list(scrabble.iterMoves())
+			moves.sort(key=lambda move: -move[0])
+			moves.append(None)
+			if len(self._moves) >= TABLE_SIZE:
+				self._moves.clear()
+			self._moves[key] = moves
+		return moves
+
+
+	# play move for the player to move, None passing
+	def _applyMove(self, move):
+		if move is None:
+			self.scrabble.applyPass()
+		elif self.scrabble.applyMove(move[1], move[2], move[3]) is False:
+			raise ValueError('move cannot be played: ' + str(move[1:4]))
+
+
+	# return the line of best moves stored from the position to move, at most depth moves
+	def _getLine(self, depth):
+		scrabble = self.scrabble
+		line = []
+		applied = 0
+		try:
+			while len(line) < depth and not scrabble.isGameOver(self.scoreless_limit):
+				entry = self._table.get(self._getKey())
+				if entry is None:
+					break
+				line.append(entry[3])
+				self._applyMove(entry[3])
+				applied += 1
+		finally:
+			for i in range(0, applied):
+				scrabble.undoMove()
+		return line
+
+
+	# return transposition table key of the position to move
+	def _getKey(self):
+		scrabble = self.scrabble
+		rack = scrabble.player_data[scrabble.player]['rack']
+		opponent = scrabble.player_data[scrabble.player_list[1 - scrabble.player_index]]['rack']
+		return (scrabble.board.hash, rack.signature, opponent.signature, scrabble.scoreless_turns)
+
+
+	# return points of the tiles on the rack of player
+	def _getRackPoints(self, player):
+		letters_points = self.scrabble.letters_points
+		return sum(letters_points[l] for l in self.scrabble.player_data[player]['rack'].letters())
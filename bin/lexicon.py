@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import os
+import sys
+import mmap
+import zlib
+import ctypes
+import struct
+import weakref
+import tempfile
+from array import array
+from itertools import combinations_with_replacement
+
+# global variables
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+LETTER_INDEX = dict((l, i) for i, l in enumerate(ALPHABET))
+
+# packed edge layout: [ child node : 25 | last edge : 1 | terminal : 1 | letter : 5 ]
+LETTER_MASK = 0x1f
+TERMINAL_BIT = 0x20
+LAST_BIT = 0x40
+CHILD_SHIFT = 7
+
+# compiled lexicon file: header followed by the edge array in native byte order
+COMPILED_SUFFIX = '.dawg'
+MAGIC = 'SCRBDAWG'
+FORMAT_VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+HEADER = struct.Struct('=8sIIIIIII')
+
+# most nodes whose edges are kept decoded; the cache starts over once full
+CHILDREN_CACHE_SIZE = 8192
+
+# lexicons already loaded, by (path, checksum), shared while anything still references them
+_loaded = weakref.WeakValueDictionary()
+
+
+class Lexicon:
+	'''
+	Word list stored as a minimized DAWG, packed into a flat array of edges.
+
+	A node is the index of its first edge; edges of a node are contiguous and the last one is flagged.
+	Node 0 is reserved for "no outgoing edges". Each edge carries its letter, whether a word ends on
+	that letter, and the node it leads to. The edges of up to CHILDREN_CACHE_SIZE nodes the move search
+	visits are kept decoded; everything else is read straight from the edge array, so a mapped lexicon
+	stays shared between processes.
+	'''
+
+	def __init__(self, words=()):
+		self.edges = array('I', [0])
+		self.root = 0
+		self.word_count = 0
+		self.checksum = 0
+		self._mmap = None
+		self._children = {}
+		self._anagrams = None
+		self._build(words)
+
+
+	# load a lexicon from a compiled lexicon file, or from a whitespace separated word list through its
+	# compiled file (dictionary_file + COMPILED_SUFFIX), which is rebuilt when missing or stale.
+	# A lexicon already loaded from the same file contents is returned as is.
+	@classmethod
+	def fromFile(cls, dictionary_file):
+		with open(dictionary_file, 'rb') as f:
+			magic = f.read(len(MAGIC))
+			if magic == MAGIC:
+				header = magic + f.read(HEADER.size - len(MAGIC))
+				key = (os.path.abspath(dictionary_file), header)
+				if key not in _loaded:
+					lexicon = cls.fromCompiled(dictionary_file)
+					if lexicon is None:
+						raise IOError('corrupt compiled lexicon: ' + str(dictionary_file))
+					_loaded[key] = lexicon
+				return _loaded[key]
+			source = magic + f.read()
+		checksum = zlib.crc32(source) & 0xffffffff
+		key = (os.path.abspath(dictionary_file), checksum)
+		lexicon = _loaded.get(key)
+		if lexicon is not None:
+			return lexicon
+		compiled_file = dictionary_file + COMPILED_SUFFIX
+		lexicon = cls.fromCompiled(compiled_file, checksum)
+		if lexicon is None:
+			lexicon = cls(source.split())
+			lexicon.checksum = checksum
+			try:
+				lexicon.save(compiled_file)
+			except (IOError, OSError):
+				pass
+		_loaded[key] = lexicon
+		return lexicon
+
+
+	# map a compiled lexicon file into memory without copying it, None if the file is missing, corrupt,
+	# from another format version, or was compiled from a word list other than checksum
+	@classmethod
+	def fromCompiled(cls, compiled_file, checksum=None):
+		try:
+			f = open(compiled_file, 'rb')
+		except IOError:
+			return None
+		with f:
+			header = f.read(HEADER.size)
+			if len(header) < HEADER.size:
+				return None
+			magic, version, byte_order, source_checksum, root, word_count, edge_count, reserved = HEADER.unpack(header)
+			if magic != MAGIC or version != FORMAT_VERSION or byte_order != BYTE_ORDER_MARK:
+				return None
+			if checksum is not None and source_checksum != checksum:
+				return None
+			if os.fstat(f.fileno()).st_size != HEADER.size + edge_count * 4:
+				return None
+			# copy-on-write mapping: pages stay shared between processes since edges are never written
+			buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+		lexicon = cls()
+		lexicon.edges = (ctypes.c_uint32 * edge_count).from_buffer(buf, HEADER.size)
+		lexicon.root = root
+		lexicon.word_count = word_count
+		lexicon.checksum = source_checksum
+		lexicon._mmap = buf
+		return lexicon
+
+
+	# write lexicon to a compiled lexicon file (written aside and renamed, so readers never see a partial file)
+	def save(self, compiled_file):
+		edges = array('I', self.edges)
+		header = HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK, self.checksum, self.root, self.word_count, len(edges), 0)
+		fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(compiled_file)))
+		try:
+			with os.fdopen(fd, 'wb') as f:
+				f.write(header)
+				edges.tofile(f)
+			# mkstemp creates the file readable by its owner only, give it the mode open() would
+			umask = os.umask(0)
+			os.umask(umask)
+			os.chmod(tmp_file, 0666 & ~umask)
+			os.rename(tmp_file, compiled_file)
+		except:
+			os.remove(tmp_file)
+			raise
+
+
+	# build the DAWG from words, minimizing incrementally over the sorted word list (linear in total letters)
+	def _build(self, words):
+		# build node: [terminal, {letter: node}]
+		root = [False, {}]
+		register = {}
+		unchecked = []
+		previous = ''
+		for word in sorted(set(w for w in words if len(w) >= 2 and self._isEncodable(w))):
+			common = 0
+			for a, b in zip(previous, word):
+				if a != b: break
+				common += 1
+			self._minimize(unchecked, register, common)
+			node = unchecked[-1][2] if unchecked else root
+			for letter in word[common:]:
+				child = [False, {}]
+				node[1][letter] = child
+				unchecked.append((node, letter, child))
+				node = child
+			node[0] = True
+			previous = word
+			self.word_count += 1
+		self._minimize(unchecked, register, 0)
+		self.root = self._freeze(root)
+
+
+	# check whether every letter of word can be encoded
+	def _isEncodable(self, word):
+		for l in word:
+			if l not in LETTER_INDEX: return False
+		return True
+
+
+	# merge unchecked nodes (deepest first) down to depth with equivalent registered nodes
+	def _minimize(self, unchecked, register, depth):
+		while len(unchecked) > depth:
+			parent, letter, child = unchecked.pop()
+			key = (child[0], tuple((l, id(n)) for l, n in sorted(child[1].items())))
+			if key in register:
+				parent[1][letter] = register[key]
+			else:
+				register[key] = child
+
+
+	# pack build nodes into the flat edge array, return index of root node
+	def _freeze(self, root):
+		positions = {}
+		order = []
+		offset = len(self.edges)
+		stack = [root]
+		# assign every node with outgoing edges a contiguous block of edges
+		while stack:
+			node = stack.pop()
+			if id(node) in positions or not node[1]:
+				continue
+			positions[id(node)] = offset
+			offset += len(node[1])
+			order.append(node)
+			stack.extend(node[1].values())
+		for node in order:
+			letters = sorted(node[1])
+			for i, l in enumerate(letters):
+				child = node[1][l]
+				edge = LETTER_INDEX[l] | (positions.get(id(child), 0) << CHILD_SHIFT)
+				if child[0]: edge |= TERMINAL_BIT
+				if i == len(letters) - 1: edge |= LAST_BIT
+				self.edges.append(edge)
+		return positions.get(id(root), 0)
+
+
+	# return list of (letter, child node, terminal) leaving node
+	def children(self, node):
+		if node in self._children:
+			return self._children[node]
+		children = self._decode(node)
+		if len(self._children) >= CHILDREN_CACHE_SIZE:
+			self._children.clear()
+		self._children[node] = children
+		return children
+
+
+	# return list of (letter, child node, terminal) leaving node, read from the edge array
+	def _decode(self, node):
+		children = []
+		edges = self.edges
+		pos = node
+		while pos:
+			edge = edges[pos]
+			children.append((ALPHABET[edge & LETTER_MASK], edge >> CHILD_SHIFT, bool(edge & TERMINAL_BIT)))
+			if edge & LAST_BIT: break
+			pos += 1
+		return children
+
+
+	# return (child node, terminal) following letter from node, None if no such edge
+	def child(self, node, letter):
+		for l, child, terminal in self.children(node):
+			if l == letter:
+				return child, terminal
+		return None
+
+
+	# return (node, terminal) reached by walking prefix from node, None if prefix is not in lexicon
+	def follow(self, prefix, node=None):
+		if node is None: node = self.root
+		terminal = False
+		for letter in prefix:
+			edge = self.child(node, letter)
+			if not edge: return None
+			node, terminal = edge
+		return node, terminal
+
+
+	# check whether word exists in lexicon
+	def __contains__(self, word):
+		result = self.follow(word)
+		return bool(result and result[1])
+
+
+	def __len__(self):
+		return self.word_count
+
+
+	# iterate over every word in alphabetical order, without filling the children cache
+	def __iter__(self):
+		stack = [(child, letter, terminal) for letter, child, terminal in reversed(self._decode(self.root))]
+		while stack:
+			node, prefix, terminal = stack.pop()
+			if terminal: yield prefix
+			for letter, child, terminal in reversed(self._decode(node)):
+				stack.append((child, prefix + letter, terminal))
+
+
+	# return words made from any subset of letters plus up to blanks wildcard letters
+	def findAnagrams(self, letters, blanks=0):
+		if self._anagrams is None:
+			self._buildAnagrams()
+		counts = {}
+		for l in letters:
+			counts[l] = counts.get(l, 0) + 1
+		found = set()
+		for subset in self._getSubsets(sorted(counts.items())):
+			for count in range(0, blanks + 1):
+				if len(subset) + count < 2:
+					continue
+				for wildcards in combinations_with_replacement(ALPHABET, count):
+					key = ''.join(sorted(subset + ''.join(wildcards)))
+					if key in self._anagrams:
+						found.update(self._anagrams[key])
+		return found
+
+
+	# index every word by its sorted letters
+	def _buildAnagrams(self):
+		self._anagrams = {}
+		for word in self:
+			key = ''.join(sorted(word))
+			if key not in self._anagrams:
+				self._anagrams[key] = []
+			self._anagrams[key].append(word)
+
+
+	# return every distinct sub-multiset of (letter, count) pairs as a string
+	def _getSubsets(self, counts):
+		subsets = ['']
+		for letter, count in counts:
+			subsets = [s + letter * n for s in subsets for n in range(0, count + 1)]
+		return subsets
+
+
+# compile a word list into a lexicon file: python lexicon.py WORD_LIST [COMPILED_FILE]
+if __name__ == '__main__':
+	if len(sys.argv) not in (2, 3):
+		exit('usage: python lexicon.py WORD_LIST [COMPILED_FILE]')
+	dictionary_file = sys.argv[1]
+	compiled_file = sys.argv[2] if len(sys.argv) == 3 else dictionary_file + COMPILED_SUFFIX
+	with open(dictionary_file, 'rb') as f:
+		source = f.read()
+	lexicon = Lexicon(source.split())
+	lexicon.checksum = zlib.crc32(source) & 0xffffffff
+	lexicon.save(compiled_file)
+	print 'compiled '+str(len(lexicon))+' words ('+str(len(lexicon.edges))+' edges) into '+compiled_file
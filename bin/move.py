@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+
+class Move(object):
+	'''
+	One candidate placement: word, start square, direction and the tiles it takes from the rack (sorted,
+	'blank' for blanks).
+
+	Moves are immutable and hashed once when created, so two moves compare equal exactly when they place the
+	same word the same way, and can be kept in sets and dicts (verify.py compares the generated moves with
+	its own that way). The generator yields each move once, so the search itself does not deduplicate them.
+	They unpack as (word, tile, direction, letters_used) like the tuples they replace; asTuple gives the form
+	optimalMap['words'] holds. A new-style class, as __slots__ needs one.
+	'''
+
+	__slots__ = ('word', 'tile', 'direction', 'letters_used', '_hash')
+
+	def __init__(self, word, tile, direction, letters_used):
+		letters_used = tuple(sorted(letters_used))
+		object.__setattr__(self, 'word', word)
+		object.__setattr__(self, 'tile', tile)
+		object.__setattr__(self, 'direction', direction)
+		object.__setattr__(self, 'letters_used', letters_used)
+		object.__setattr__(self, '_hash', hash((word, tile, direction, letters_used)))
+
+
+	# return (word, tile as 'row-col', direction, letters_used as a list) of this move on board
+	def asTuple(self, board):
+		return (self.word, board.getTile(self.tile), self.direction, list(self.letters_used))
+
+
+	def __setattr__(self, name, value):
+		raise AttributeError('moves are immutable')
+
+
+	def __delattr__(self, name):
+		raise AttributeError('moves are immutable')
+
+
+	def __iter__(self):
+		return iter((self.word, self.tile, self.direction, list(self.letters_used)))
+
+
+	def __eq__(self, other):
+		if not isinstance(other, Move):
+			return NotImplemented
+		return self._hash == other._hash and self.word == other.word and self.tile == other.tile and \
+			self.direction == other.direction and self.letters_used == other.letters_used
+
+
+	def __ne__(self, other):
+		equal = self.__eq__(other)
+		return equal if equal is NotImplemented else not equal
+
+
+	def __hash__(self):
+		return self._hash
+
+
+	def __reduce__(self):
+		return (Move, (self.word, self.tile, self.direction, self.letters_used))
+
+
+	def __repr__(self):
+		return 'Move(%r, %r, %r, %r)' % (self.word, self.tile, self.direction, list(self.letters_used))
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+from collections import OrderedDict
+
+# global variables
+DEFAULT_SIZE = 1024
+
+
+class MoveCache:
+	'''
+	Least recently used cache of optimal move results, shared by the games played under one set of rules.
+
+	Entries are keyed by (lexicon checksum, board hash, rack signature): the Zobrist hash of the board and the
+	tile counts of the rack, so any game reaching the same position with the same tiles finds it, and a lexicon
+	compiled from another word list never does. Each entry also keeps the board letters and points it was
+	computed on, so a hash collision is a miss rather than a wrong answer. Results go in and come out as
+	copies; callers may change what they get. A size of 0 disables the cache.
+	'''
+
+	def __init__(self, size=DEFAULT_SIZE):
+		self.size = size
+		self.hits = 0
+		self.misses = 0
+		self._entries = OrderedDict()
+
+
+	# return key of the current position of scrabble
+	def getKey(self, scrabble):
+		rack = scrabble.player_data[scrabble.player]['rack']
+		return (scrabble.lexicon.checksum, scrabble.board.hash, rack.signature)
+
+
+	# return a copy of the optimalMap cached for the current position of scrabble, None if not cached
+	def get(self, scrabble):
+		key = self.getKey(scrabble)
+		entry = self._entries.pop(key, None)
+		if entry is None or entry[0] != scrabble.board.letters or entry[1] != scrabble.board.points:
+			self.misses += 1
+			return None
+		# most recently used entries go last
+		self._entries[key] = entry
+		self.hits += 1
+		return self._copy(entry[2])
+
+
+	# cache a copy of optimalMap for the current position of scrabble, evicting the least recently used entries
+	def put(self, scrabble, optimalMap):
+		if self.size <= 0:
+			return
+		key = self.getKey(scrabble)
+		self._entries.pop(key, None)
+		self._entries[key] = (scrabble.board.letters[:], scrabble.board.points[:], self._copy(optimalMap))
+		while len(self._entries) > self.size:
+			self._entries.popitem(last=False)
+
+
+	# change the number of entries kept, evicting the least recently used ones
+	def resize(self, size):
+		self.size = size
+		while len(self._entries) > max(size, 0):
+			self._entries.popitem(last=False)
+
+
+	# drop every entry and reset counters
+	def clear(self):
+		self._entries.clear()
+		self.hits = 0
+		self.misses = 0
+
+
+	def __len__(self):
+		return len(self._entries)
+
+
+	# return copy of optimalMap
+	def _copy(self, optimalMap):
+		return {'points': optimalMap['points'], 'words': [(w, t, d, list(l)) for w, t, d, l in optimalMap['words']]}
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+from board import ACROSS, DOWN
+from rack import TILE_INDEX, BLANK
+
+# global variables
+BINGO_TILES = 7
+BINGO_BONUS = 50
+
+
+class MoveGenerator:
+	'''
+	Anchor / cross-check move generator (Appel & Jacobson, "The World's Fastest Scrabble Program").
+
+	Every line of the board is searched once per direction. Anchors are the empty squares next to a tile;
+	cross-checks are the letters allowed on an empty square by the tiles above and below it (or left and
+	right of it, for down words). Words are grown through the lexicon from a left part made of rack letters
+	or board letters, then extended right across the anchor, so only prefixes of real words are ever tried.
+
+	Every legal placement is generated exactly once. Left parts never cover an anchor, so a placement is only
+	found from the first anchor it covers; a blank only stands for a letter once the rack holds no more of
+	it; main words are at least two letters long; and a single tile forming an across word is only generated
+	across, not again as the down word through it.
+
+	When threshold is set, placements scoring less than it even with every letter at face value are dropped
+	before the caller looks their letters up and scores them, so only placements that could score at least
+	threshold are generated, in the same order. The caller may raise threshold between placements.
+
+	The search is counted into the SearchStats of the game (scrabble.stats) while one is set.
+	'''
+
+	def __init__(self, scrabble):
+		self.scrabble = scrabble
+		self.lexicon = scrabble.lexicon
+		self.board = scrabble.board
+		self.cross_checks = scrabble.cross_checks
+		self.size = scrabble.board.size
+		self.threshold = None
+		self.stats = scrabble.stats
+		self._min_tiles = 1
+
+
+	# yield (word, start square, direction, letters_needed) for every placement creatable from rack
+	def generate(self, rack):
+		for direction in (ACROSS, DOWN):
+			for line in range(0, self.size):
+				for move in self.generateLine(rack, direction, line):
+					yield move
+
+
+	# yield placements of one line (a row for ACROSS, a column for DOWN), in the order generate() finds them
+	def generateLine(self, rack, direction, line):
+		squares = self.board.getLine(line, direction)
+		cells, checks, anchors = self._getLine(squares, direction)
+		bound = None
+		if self.threshold is not None:
+			bound = LineBound(self.scrabble, squares, direction, cells, checks)
+		stats = self.stats
+		for anchor in range(0, self.size):
+			if not anchors[anchor]:
+				continue
+			# a single tile down with letters beside it also forms an across word, and is found across
+			self._min_tiles = 2 if direction == DOWN and checks[anchor] is not None else 1
+			moves = []
+			self._searchAnchor(cells, checks, anchors, anchor, rack, moves)
+			if stats is not None:
+				stats.count('anchors')
+				stats.count('candidates', len(moves))
+			for word, start, letters_needed in moves:
+				if bound is not None and bound.getScore(word, start) < self.threshold:
+					if stats is not None: stats.reject('bound')
+					continue
+				yield word, squares[start], direction, letters_needed
+
+
+	# return letters, cached cross-checks and anchor flags of the squares of one line
+	def _getLine(self, squares, direction):
+		letters = self.board.letters
+		allowed = self.cross_checks.allowed[direction]
+		anchors = self.cross_checks.anchors
+		cells = [chr(letters[s]) if letters[s] else None for s in squares]
+		checks = [allowed[s] for s in squares]
+		return cells, checks, [anchors[s] for s in squares]
+
+
+	# find all words through anchor, starting from the tiles left of it or from a left part made of rack letters
+	def _searchAnchor(self, cells, checks, anchors, anchor, rack, moves):
+		if anchor > 0 and cells[anchor-1] is not None:
+			start = anchor - 1
+			while start > 0 and cells[start-1] is not None:
+				start -= 1
+			prefix = ''.join(cells[start:anchor])
+			result = self.lexicon.follow(prefix)
+			if result:
+				self._extendRight(cells, checks, anchor, rack, moves, prefix, [], result[0], result[1], anchor)
+		else:
+			limit = 0
+			pos = anchor - 1
+			while pos >= 0 and not anchors[pos]:
+				limit += 1
+				pos -= 1
+			self._leftPart(cells, checks, anchor, rack, moves, '', [], self.lexicon.root, limit)
+
+
+	# build left parts of up to limit rack letters before anchor, extending right from each
+	def _leftPart(self, cells, checks, anchor, rack, moves, partial, needed, node, limit):
+		self._extendRight(cells, checks, anchor, rack, moves, partial, needed, node, False, anchor)
+		if limit <= 0:
+			return
+		counts = rack.counts
+		for letter, child, terminal in self.lexicon.children(node):
+			tile = TILE_INDEX[letter]
+			if not counts[tile]:
+				if not counts[BLANK]:
+					continue
+				tile = BLANK
+			rack.take(tile)
+			needed.append(letter)
+			self._leftPart(cells, checks, anchor, rack, moves, partial + letter, needed, child, limit - 1)
+			needed.pop()
+			rack.put(tile)
+
+
+	# extend partial word rightwards from pos, recording every complete word placed past the anchor
+	def _extendRight(self, cells, checks, anchor, rack, moves, partial, needed, node, terminal, pos):
+		if pos >= self.size or cells[pos] is None:
+			if terminal and pos > anchor and len(partial) > 1 and len(needed) >= self._min_tiles:
+				moves.append((partial, pos - len(partial), list(needed)))
+			if pos >= self.size:
+				return
+			if checks[pos] is not None and self.stats is not None:
+				self._countSideWords(node, checks[pos])
+			counts = rack.counts
+			for letter, child, child_terminal in self.lexicon.children(node):
+				if checks[pos] is not None and letter not in checks[pos]:
+					continue
+				tile = TILE_INDEX[letter]
+				if not counts[tile]:
+					if not counts[BLANK]:
+						continue
+					tile = BLANK
+				rack.take(tile)
+				needed.append(letter)
+				self._extendRight(cells, checks, anchor, rack, moves, partial + letter, needed, child, child_terminal, pos + 1)
+				needed.pop()
+				rack.put(tile)
+		else:
+			edge = self.lexicon.child(node, cells[pos])
+			if edge:
+				self._extendRight(cells, checks, anchor, rack, moves, partial + cells[pos], needed, edge[0], edge[1], pos + 1)
+
+
+	# count letters following node looked up in the side words allowed on a square, and those rejected
+	def _countSideWords(self, node, allowed):
+		letters = [letter for letter, child, terminal in self.lexicon.children(node)]
+		self.stats.count('side_word_lookups', len(letters))
+		rejected = sum(1 for letter in letters if letter not in allowed)
+		if rejected: self.stats.reject('side_word', rejected)
+
+
+class LineBound:
+	'''
+	Upper bound on the score of placements along one line, used to cut the move search.
+
+	getScore scores a placement with every letter at face value: the true score, or more when a blank stands
+	for some letter.
+	'''
+
+	def __init__(self, scrabble, squares, direction, cells, checks):
+		board = scrabble.board
+		side_points = scrabble.cross_checks.side_points[direction]
+		self.letters_points = scrabble.letters_points
+		self.cells = cells
+		self.checks = checks
+		self.points = [board.points[s] for s in squares]
+		self.letter_multiplier = [board.letter_multiplier[s] for s in squares]
+		self.word_multiplier = [board.word_multiplier[s] for s in squares]
+		self.side_points = [side_points[s] for s in squares]
+
+
+	# return score of word placed from start, every letter at face value
+	def getScore(self, word, start):
+		main = side = placed = 0
+		multiplier = 1
+		pos = start
+		for letter in word:
+			if self.cells[pos] is not None:
+				main += self.points[pos]
+			else:
+				letter_points = self.letters_points[letter] * self.letter_multiplier[pos]
+				main += letter_points
+				multiplier *= self.word_multiplier[pos]
+				if self.checks[pos] is not None:
+					side += (self.side_points[pos] + letter_points) * self.word_multiplier[pos]
+				placed += 1
+			pos += 1
+		points = main * multiplier + side
+		if placed == BINGO_TILES:
+			points += BINGO_BONUS
+		return points
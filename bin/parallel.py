@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import multiprocessing
+from scrabble import Scrabble
+from movegen import MoveGenerator
+from board import ACROSS, DOWN
+from rack import Rack
+from move import Move
+from stats import SearchStats
+
+# per-process worker state: the shared rules, and the game rebuilt for the last board searched
+_worker = {'rules': None, 'state': None, 'game': None}
+
+
+# set rules of a worker process, once when its pool starts. pools running tasks on worker games (MovePool,
+# the game server) start their processes with it
+def initWorker(rules):
+	_worker['rules'] = rules
+	_worker['state'] = None
+	_worker['game'] = None
+
+
+# return rules of this worker process, as set by initWorker
+def getWorkerRules():
+	return _worker['rules']
+
+
+# return a game of this worker process holding the board given by its letters and points, reused while the
+# board is unchanged
+def getWorkerGame(letters, points):
+	if _worker['state'] != (letters, points):
+		game = Scrabble(1, rules=_worker['rules'])
+		placed = [s for s in range(0, game.board.squares) if letters[s] != '\0']
+		for square in placed:
+			game.board.place(square, letters[square], ord(points[square]))
+		game.cross_checks.update(placed)
+		_worker['state'] = (letters, points)
+		_worker['game'] = game
+	return _worker['game']
+
+
+# search one line of the board, returning the optimalMap of its placements and, if asked for, the
+# SearchStats of the search (None otherwise)
+def _searchLine(task):
+	letters, points, rack_letters, direction, line, collect = task
+	game = getWorkerGame(letters, points)
+	rack = Rack(rack_letters)
+	game.stats = SearchStats() if collect else None
+	try:
+		generator = MoveGenerator(game)
+		generator.threshold = 0
+		optimalMap = {}
+		optimalMap['points'] = 0
+		optimalMap['words'] = []
+		game._getOptimalPlacement(optimalMap, game._scorePlacements(_getLinePlacements(generator, rack, direction, line), rack), generator)
+		return optimalMap, game.stats
+	finally:
+		game.stats = None
+
+
+# yield valid placements of one line, as moves
+def _getLinePlacements(generator, rack, direction, line):
+	for word, tile, direction, letters_needed in generator.generateLine(rack, direction, line):
+		yield Move(word, tile, direction, rack.lettersUsed(letters_needed))
+
+
+class MovePool:
+	'''
+	Process pool searching the optimal move of games played under one set of rules.
+
+	The search is split by line: every row (across words) and column (down words) holding an anchor is a
+	task, and workers send back the optimalMap of their line. Results are merged in the order the serial
+	search visits lines, so points and tied words come out exactly as Scrabble._searchOptimalMove() returns them.
+	Rules (and so the lexicon) reach the workers once, inherited when the pool forks; each task only
+	carries the board letters and points and the rack. While the game counts its search into a SearchStats,
+	every line is counted into its own in the worker and merged back, so phase times add up across processes.
+	'''
+
+	def __init__(self, rules, processes=None):
+		self.rules = rules
+		self.pool = multiprocessing.Pool(processes, initWorker, (rules,))
+
+
+	# get next optimal move of scrabble, searching its lines across the pool
+	def getOptimalMove(self, scrabble):
+		if scrabble.rules is not self.rules:
+			raise ValueError('game is not played under the rules of this pool')
+		board = scrabble.board
+		# opening moves only go through the center, nothing to split
+		if not board.tile_count:
+			return scrabble._searchOptimalMove()
+		letters = str(board.letters)
+		points = board.points.tostring()
+		rack_letters = scrabble.player_data[scrabble.player]['rack'].letters()
+		stats = scrabble.stats
+		tasks = []
+		for direction in (ACROSS, DOWN):
+			for line in range(0, board.size):
+				squares = board.getLine(line, direction)
+				if any(scrabble.cross_checks.anchors[s] for s in squares):
+					tasks.append((letters, points, rack_letters, direction, line, stats is not None))
+		optimalMap = {}
+		optimalMap['points'] = 0
+		optimalMap['words'] = []
+		for result, line_stats in self.pool.imap(_searchLine, tasks):
+			if line_stats is not None:
+				stats.merge(line_stats)
+			if result['points'] > optimalMap['points']:
+				optimalMap['points'] = result['points']
+				optimalMap['words'] = result['words']
+			elif result['points'] == optimalMap['points']:
+				optimalMap['words'].extend(result['words'])
+		return optimalMap
+
+
+	# stop worker processes once pending tasks are done
+	def close(self):
+		self.pool.close()
+		self.pool.join()
+
+
+	def __enter__(self):
+		return self
+
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+from lexicon import ALPHABET
+
+# global variables
+TILES = list(ALPHABET) + ['blank']
+TILE_INDEX = dict((l, i) for i, l in enumerate(TILES))
+BLANK = TILE_INDEX['blank']
+SIGNATURE_BITS = 8
+
+
+class Rack:
+	'''
+	Letters in hand as a count per tile (slots 0-25 for a-z, slot 26 for blanks).
+
+	take/put are O(1) and undo each other, so one rack can be threaded through a search. signature packs
+	the counts into one integer, identical for any two racks holding the same tiles, and is kept up to date
+	on every change so it can be used as a cache key.
+	'''
+
+	def __init__(self, letters=()):
+		self.counts = [0] * len(TILES)
+		self.size = 0
+		self.signature = 0
+		for l in letters:
+			self.put(TILE_INDEX[l])
+
+
+	# add one tile by index
+	def put(self, index):
+		self.counts[index] += 1
+		self.size += 1
+		self.signature += 1 << (index * SIGNATURE_BITS)
+
+
+	# remove one tile by index
+	def take(self, index):
+		self.counts[index] -= 1
+		self.size -= 1
+		self.signature -= 1 << (index * SIGNATURE_BITS)
+
+
+	# add letter to rack
+	def add(self, letter):
+		self.put(TILE_INDEX[letter])
+
+
+	# remove letter from rack, ValueError if not in rack
+	def remove(self, letter):
+		if not self.count(letter):
+			raise ValueError('letter not in rack: ' + str(letter))
+		self.take(TILE_INDEX[letter])
+
+
+	# return number of copies of letter in rack
+	def count(self, letter):
+		if letter not in TILE_INDEX:
+			return 0
+		return self.counts[TILE_INDEX[letter]]
+
+
+	# check whether letter can be played, either from a matching tile or a blank
+	def canPlay(self, letter):
+		return self.counts[TILE_INDEX[letter]] > 0 or self.counts[BLANK] > 0
+
+
+	def __contains__(self, letter):
+		return self.count(letter) > 0
+
+
+	def __len__(self):
+		return self.size
+
+
+	# return letters in rack, blanks last
+	def letters(self):
+		letters = []
+		for i, count in enumerate(self.counts):
+			letters.extend([TILES[i]] * count)
+		return letters
+
+
+	def copy(self):
+		rack = Rack()
+		rack.counts = list(self.counts)
+		rack.size = self.size
+		rack.signature = self.signature
+		return rack
+
+
+	# returns letters_used if letters_needed can be made from rack (blanks only cover missing letters), False otherwise.
+	def lettersUsed(self, letters_needed):
+		if self.size < len(letters_needed):
+			return False
+		needed = [0] * len(TILES)
+		for l in letters_needed:
+			needed[TILE_INDEX[l]] += 1
+		blanks = self.counts[BLANK]
+		for i in range(0, BLANK):
+			if needed[i] > self.counts[i]:
+				blanks -= needed[i] - self.counts[i]
+		if blanks < 0:
+			return False
+		# the first missing copies of each letter are covered by blanks
+		missing = [max(0, needed[i] - self.counts[i]) for i in range(0, BLANK)]
+		letters_used = []
+		for l in letters_needed:
+			i = TILE_INDEX[l]
+			if missing[i]:
+				missing[i] -= 1
+				letters_used.append('blank')
+			else:
+				letters_used.append(l)
+		return letters_used
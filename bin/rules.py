@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import zlib
+import weakref
+import ConfigParser
+from lexicon import Lexicon
+from board import tileToIndex
+from rack import TILES
+from movecache import MoveCache
+
+# global variables
+PREMIUM_SQUARES = (('double_letter', 'letter', 2), ('triple_letter', 'letter', 3), ('double_word', 'word', 2), ('triple_word', 'word', 3))
+
+# rules already loaded, shared while any game still references them
+_loaded = weakref.WeakValueDictionary()
+
+
+class Rules:
+	'''
+	Read-only game rules shared by every Scrabble instance playing under them: lexicon, board layout with
+	its premium squares, rack size and letter distribution. A game only keeps its own board, bag and racks.
+	Games under the same rules also share move_cache, the optimal moves already found for a position.
+	checksum identifies the board layout and letters, without the lexicon (which has its own).
+	'''
+
+	def __init__(self, lexicon, board_size, rack_size, center_tile, premium_squares, letters):
+		self.lexicon = lexicon
+		self.board_size = board_size
+		self.rack_size = rack_size
+		self.center = tileToIndex(center_tile, board_size)
+		letter_multiplier = [1] * (board_size * board_size)
+		word_multiplier = [1] * (board_size * board_size)
+		for name, kind, multiplier in PREMIUM_SQUARES:
+			multipliers = letter_multiplier if kind == 'letter' else word_multiplier
+			for tile in premium_squares.get(name, ()):
+				if tile: multipliers[tileToIndex(tile, board_size)] = multiplier
+		self.letter_multiplier = tuple(letter_multiplier)
+		self.word_multiplier = tuple(word_multiplier)
+		# letters maps each tile to (count in bag, points)
+		self.letters_count = dict((l, letters[l][0]) for l in letters)
+		self.letters_points = dict((l, letters[l][1]) for l in letters)
+		self.letters_total = sum(self.letters_count.values())
+		# checksum of everything above but the lexicon, identifying the layout games are saved under
+		layout = (board_size, rack_size, self.center, self.letter_multiplier, self.word_multiplier, sorted(letters.items()))
+		self.checksum = zlib.crc32(repr(layout)) & 0xffffffff
+		self.move_cache = MoveCache()
+
+
+	# return rules from the [init] and [letters] sections of config, shared with any game loaded from the same rules
+	@classmethod
+	def fromConfig(cls, config, dictionary_file):
+		lexicon = Lexicon.fromFile(dictionary_file)
+		board_size = config.getint('init', 'board_size')
+		rack_size = config.getint('init', 'rack_size')
+		center_tile = config.get('init', 'center_tile')
+		premium_squares = {}
+		for name, kind, multiplier in PREMIUM_SQUARES:
+			premium_squares[name] = tuple(config.get('init', name).split('/'))
+		letters = {}
+		for l in TILES:
+			count, points = config.get('letters', l).split('/')
+			letters[l] = (int(count), int(points))
+		key = (id(lexicon), board_size, rack_size, center_tile, tuple(sorted(premium_squares.items())), tuple(sorted(letters.items())))
+		rules = _loaded.get(key)
+		if rules is None or rules.lexicon is not lexicon:
+			rules = cls(lexicon, board_size, rack_size, center_tile, premium_squares, letters)
+			_loaded[key] = rules
+		return rules
+
+
+	# return rules read from config_file
+	@classmethod
+	def fromFile(cls, config_file, dictionary_file):
+		config = ConfigParser.ConfigParser()
+		config.read(config_file)
+		return cls.fromConfig(config, dictionary_file)
@@ -1,3 +1,4 @@
+# -*- coding: utf-8 -*-
 '''
 Copyright © 2011-2012. All Rights Reserved.
 Author: Brian Chan
@@ -9,67 +10,50 @@ Contact: bchanx@gmail.com
 import os
 import sys
 import shutil
-import random
+import heapq
+import time
 import ConfigParser
+from rules import Rules
+from movegen import MoveGenerator
+from crosscheck import CrossChecks
+from board import Board
+from bag import Bag
+from rack import Rack, TILE_INDEX, BLANK
+from move import Move
 
 # global variables
 DEBUG = False
 DOWN = 'down'
 ACROSS = 'across'
+SCORELESS_LIMIT = 6
 CONFIG_DIR = '../config'
 CONFIG_FILE = os.path.join(CONFIG_DIR, 'scrabble.conf')
 DICTIONARY_FILE = os.path.join(CONFIG_DIR, 'basic_english_word_list')
-LETTER_MAP = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z', 'blank']
 
 class Scrabble:
 
-	def __init__(self, player_size, config_file, dictionary_file):
-		# initialize word list
-		allwords = open(dictionary_file).read().split()
-		self.dictionary = set(w for w in allwords if len(w) >= 2)
-
-		# initialize board rules
+	def __init__(self, player_size, config_file=None, dictionary_file=None, rules=None, seed=None):
+		# initialize board rules (word list, board layout, letters), shared between games
 		config = ConfigParser.ConfigParser()
-		config.read(config_file)
-		self.board_size = config.getint('init', 'board_size')
-		self.rack_size = config.getint('init', 'rack_size')
-		self.center_tile = config.get('init', 'center_tile')
-		self.double_letter = config.get('init', 'double_letter').split('/')
-		self.triple_letter = config.get('init', 'triple_letter').split('/')
-		self.double_word = config.get('init', 'double_word').split('/')
-		self.triple_word = config.get('init', 'triple_word').split('/')
-
-		# initialize letters
-		self.letters = {}
-		self.letters_points = {}
-		self.letters_remaining = 0
-		for l in LETTER_MAP:
-			count, points = config.get('letters', l).split('/')
-			self.letters[l] = int(count)
-			self.letters_points[l] = int(points)
-			self.letters_remaining += int(count)
-
-		# initialize possible words per letter
-		self.possible_words = {}
-		for l in LETTER_MAP:
-			if l != 'blank':
-				self.possible_words[l] = []
-		for word in self.dictionary:
-			for l in LETTER_MAP:
-				if l != 'blank' and l in word and word not in self.possible_words[l]:
-					self.possible_words[l].append(word)
+		if config_file:
+			config.read(config_file)
+		if rules is None:
+			rules = Rules.fromConfig(config, dictionary_file)
+		self.rules = rules
+		self.lexicon = rules.lexicon
+		self.board_size = rules.board_size
+		self.rack_size = rules.rack_size
+		self.letters_points = rules.letters_points
+		self.board = Board(rules)
+
+		# initialize bag, its draws fixed by seed if given
+		self.bag = Bag.fromCounts(rules.letters_count, seed)
 
 		# initialize current words in play
-		self.words_in_play = {}
-		self.tiles_in_play = {}
-		words_in_play = config.get('init', 'words_in_play')
+		self.cross_checks = CrossChecks(self.lexicon, self.board)
+		words_in_play = self._getConfig(config, 'init', 'words_in_play')
 		if words_in_play:
-			words_and_position = words_in_play.split('/')
-			for words in words_and_position:
-				word, tile, direction = words.split(';')
-				letter_placements = self._parseWord(word, tile, direction)
-				self._addWordInPlay(letter_placements, word.replace('?', '') , tile, direction)
-				self._reduceLetters(letter_placements.values())
+			self._addWordsInPlay(words_in_play)
 
 		# initialize players
 		self.player_size = player_size
@@ -78,22 +62,53 @@ class Scrabble:
 		for num in range(0, player_size):
 			self.player_list.append('player'+str(num))
 		self.player = self.player_list[self.player_index]
+		# turns in a row without points (passes, exchanges), the game ends at SCORELESS_LIMIT
+		self.scoreless_turns = 0
+		# moves of applyMove and applyPass not taken back yet, last one last
+		self.moves_applied = []
+		# counts and times of the search running, if asked for (stats.SearchStats)
+		self.stats = None
 
 		# initialize player data
 		self.player_data = {}
 		for player in self.player_list:
 			self.player_data[player] = {}
 			self.player_data[player]['score'] = 0
-			init_letters = config.get('letters_in_hand', player)
+			init_letters = self._getConfig(config, 'letters_in_hand', player)
 			if init_letters:
-				self.player_data[player]['letters_in_hand'] = init_letters.split('/')
-				self._reduceLetters(self.player_data[player]['letters_in_hand'])
+				self._reduceLetters(init_letters.split('/'))
+				self.player_data[player]['rack'] = Rack(init_letters.split('/'))
 			else:
-				self.player_data[player]['letters_in_hand'] = []
+				self.player_data[player]['rack'] = Rack()
 				self._getTiles(player)
 
 
-	# parse word from config file to get letter_placements
+	# return option from config file, empty if not set
+	def _getConfig(self, config, section, option):
+		if not config.has_option(section, option):
+			return ''
+		return config.get(section, option)
+
+
+	# place words given as in the config file ('word;tile;direction' separated by '/', '?' before a blank letter).
+	# raises ValueError on words that cannot be placed
+	def _addWordsInPlay(self, words_in_play):
+		words_and_position = words_in_play.split('/')
+		for words in words_and_position:
+			if words.count(';') != 2:
+				raise ValueError('word in play is not word;tile;direction: ' + words)
+			word, tile, direction = words.split(';')
+			if direction not in (ACROSS, DOWN):
+				raise ValueError('invalid direction: ' + direction)
+			tile = self.board.getIndex(tile)
+			if tile is None:
+				raise ValueError('tile off the board: ' + words)
+			letter_placements = self._parseWord(word, tile, direction)
+			self._addWordInPlay(letter_placements, word.replace('?', '') , tile, direction)
+			self._reduceLetters(letter_placements.values())
+
+
+	# parse word from config file to get letter_placements, ValueError if it does not fit the board
 	def _parseWord(self, word, tile, direction):
 		letter_placements = {}
 		letter_pos = 0
@@ -102,340 +117,279 @@ class Scrabble:
 			if word[letter_pos] == '?':
 				letter_pos += 1
 				current_placement = 'blank'
-			if tile not in self.tiles_in_play:
+			if letter_pos >= len(word) or word[letter_pos] not in self.letters_points or word[letter_pos] == 'blank':
+				raise ValueError('invalid letter in word: ' + word)
+			if tile is None:
+				raise ValueError('word runs off the board: ' + word)
+			if not self.board.letters[tile]:
 				letter_placements[tile] = current_placement
-			elif self.tiles_in_play[tile]['letter'] != word[letter_pos]:
-				exit('FATAL ERROR: letter in word does not match! (tile: '+str(tile)+'  placed: '+str(self.tiles_in_play[tile]['letter'])+ '  trying to add: '+str(word[letter_pos])+')')
-			tile = self._getPosition(tile, 1, direction)
+			elif self.board.getLetter(tile) != word[letter_pos]:
+				raise ValueError('letter in word does not match! (tile: '+self.board.getTile(tile)+'  placed: '+str(self.board.getLetter(tile))+ '  trying to add: '+str(word[letter_pos])+')')
+			tile = self.board.getPosition(tile, 1, direction)
 			letter_pos += 1
 		return letter_placements
 
 
-	# Returns new position if successful, False if outside board size.
-	def _getPosition(self, tile, length, direction):
-		if direction == ACROSS:
-			row, col = tile.split('-')
-			new_col = int(col) + length
-			if new_col < 0 or new_col >= self.board_size:
-				return False
-			return str(row) + '-' + str(new_col)
-		else:
-			row, col = tile.split('-')
-			new_row = int(row) + length
-			if new_row < 0 or new_row >= self.board_size:
-				return False
-			return str(new_row) + '-' + str(col)
-
-
-	# reduce letters from letters_remaining and letter map
+	# take letters out of the bag, ValueError if the bag runs out of one
 	def _reduceLetters(self, letters):
 		for l in letters:
-			if l not in self.letters:
-				exit('FATAL ERROR: not enough letters to continue. (letter: '+str(l)+')')
-			self.letters_remaining -= 1
-			self.letters[l] -= 1
-			if self.letters[l] == 0:
-				del self.letters[l]
-
-
-	# get new tiles for rack (until letters_remaining = 0 or letters_in_hand = rack_size)
-	def _getTiles(self, player):
-		while (len(self.player_data[player]['letters_in_hand']) < self.rack_size) and (self.letters_remaining > 0):
-			l = random.choice(self.letters.keys())
-			self.player_data[player]['letters_in_hand'].append(l)
-			self._reduceLetters([l])
-
-
-	# get letter with the shortest dictionary
-	def _getShortestLetter(self, word):
-		shortest_length = sys.maxint
-		shortest_letter = ''
-		for letter in set(word):
-			if len(self.possible_words[letter]) < shortest_length:
-				shortest_length = len(self.possible_words[letter])
-				shortest_letter = letter
-		return shortest_letter
-
-
-	# update words_in_play and tiles_in_play with word
-	def _addWordInPlay(self, letter_placements, word, tile, direction):
-		tile_pos = tile
-		for letter in word:
-			# already in map, update direction
-			if tile_pos in self.tiles_in_play:
-				if not self.tiles_in_play[tile_pos][direction]:
-					self.tiles_in_play[tile_pos][direction]  = {}
-				self.tiles_in_play[tile_pos][direction]['word'] = word
-				self.tiles_in_play[tile_pos][direction]['start'] = tile
-			else:
-				# letter not in map, create it
-				self.tiles_in_play[tile_pos] = {}
-				self.tiles_in_play[tile_pos]['letter'] = letter
-				self.tiles_in_play[tile_pos]['points'] = self.letters_points[letter_placements[tile_pos]]
-				self.tiles_in_play[tile_pos][direction] = {}
-				self.tiles_in_play[tile_pos][direction]['word'] = word
-				self.tiles_in_play[tile_pos][direction]['start'] = tile
-				
-				# check whether previous or next tiles need to be updated
-				other_direction = self._getOtherDirection(direction)
-				self.tiles_in_play[tile_pos][other_direction] = {}
-				sideWord = self._checkSideWord(tile_pos, letter, other_direction)
-
-				# side word created, assume its valid at this point
-				if sideWord:
-					side_word = sideWord['word']
-					side_start_tile = sideWord['start']
-					# check prev and next positions
-					prev_pos = self._getPosition(tile_pos, -1, other_direction)
-					next_pos = self._getPosition(tile_pos, 1, other_direction)
-					if prev_pos in self.tiles_in_play:
-						self._updateTiles(side_word, side_start_tile, prev_pos, other_direction)
-					if next_pos in self.tiles_in_play:
-						self._updateTiles(side_word, side_start_tile, next_pos, other_direction)
-					self.tiles_in_play[tile_pos][other_direction]['word'] = side_word
-					self.tiles_in_play[tile_pos][other_direction]['start'] = side_start_tile
-					# add sideword to words_in_play
-					if side_word not in self.words_in_play:
-						self.words_in_play[side_word] = {}
-						self.words_in_play[side_word]['placements'] = []
-						self.words_in_play[side_word]['shortest'] = self._getShortestLetter(word)
-					self.words_in_play[side_word]['placements'].append(side_start_tile+';'+other_direction)
-			# update tile position
-			tile_pos = self._getPosition(tile_pos, 1, direction)
-		if word not in self.words_in_play:
-			self.words_in_play[word] = {}
-			self.words_in_play[word]['placements'] = []
-			self.words_in_play[word]['shortest'] = self._getShortestLetter(word)
-		self.words_in_play[word]['placements'].append(tile+';'+direction)
-
-
-	# update tiles_in_play and words_in_play with new data
-	def _updateTiles(self, new_word, new_start_tile, tile, other_direction):
-		# do cleanup if tile is currently a word
-		if self.tiles_in_play[tile][other_direction]:
-			old_start_pos = self.tiles_in_play[tile][other_direction]['start']
-			old_word = self.tiles_in_play[tile][other_direction]['word']
-			old_word_length = len(old_word)
-			tile_pos = old_start_pos
-			for i in range(0, old_word_length):
-				self.tiles_in_play[tile_pos][other_direction]['word'] = new_word
-				self.tiles_in_play[tile_pos][other_direction]['start'] = new_start_tile
-				tile_pos = self._getPosition(tile_pos, 1, other_direction)
-			# do cleanup in self.words_in_play
-			if old_word in self.words_in_play:
-				placement_key = old_start_pos+';'+other_direction
-				if placement_key in self.words_in_play[old_word]['placements']:
-					self.words_in_play[old_word]['placements'].remove(placement_key)
-					if not self.words_in_play[old_word]['placements']:
-						del self.words_in_play[old_word]
-		# else tile is only a letter
-		else:
-			self.tiles_in_play[tile][other_direction]['word'] = new_word
-			self.tiles_in_play[tile][other_direction]['start'] = new_start_tile
-
-
-	# check surrounding tiles to see whether side word can be created
-	def _checkSideWord(self, tile, current_letter, other_direction):
-		sideWord = {}
-		side_word_start = tile
-
-		# checking surrounding letters; check up if ACROSS, left if DOWN
-		prev_word = ''
-		prev_tile = self._getPosition(tile, -1, other_direction)
-		if prev_tile in self.tiles_in_play:
-			if self.tiles_in_play[prev_tile][other_direction]:
-				prev_word = self.tiles_in_play[prev_tile][other_direction]['word']
-				side_word_start = self.tiles_in_play[prev_tile][other_direction]['start']
-			else:
-				prev_word = self.tiles_in_play[prev_tile]['letter']
-				side_word_start = prev_tile
-		# checking surrounding letters; check down if ACROSS, right if DOWN
-		next_word = ''
-		next_tile = self._getPosition(tile, 1, other_direction)
-		if next_tile in self.tiles_in_play:
-			if self.tiles_in_play[next_tile][other_direction]:
-				next_word += self.tiles_in_play[next_tile][other_direction]['word']
-			else:
-				next_word += self.tiles_in_play[next_tile]['letter']
-		# if surrounding letters exist, return resulting word created
-		if prev_word or next_word:
-			sideWord['word'] = prev_word + current_letter + next_word
-			sideWord['start'] = side_word_start
-		return sideWord
+			if not self.bag.count(l):
+				raise ValueError('not enough letters to continue. (letter: '+str(l)+')')
+			self.bag.remove([l])
 
 
-	# get other direction
-	def _getOtherDirection(self, direction):
-		if direction == ACROSS: return DOWN
-		return ACROSS
+	# get new tiles for rack (until bag is empty or rack is rack_size), saving draws to journal if given
+	def _getTiles(self, player, journal=None):
+		while (len(self.player_data[player]['rack']) < self.rack_size) and len(self.bag):
+			self.player_data[player]['rack'].add(self.bag.draw(journal))
 
 
-	# get next optimal move
-	def getOptimalMove(self):
+	# place new tiles of word onto the board, saving cross-checks changed to journal if given
+	def _addWordInPlay(self, letter_placements, word, tile, direction, journal=None):
+		for letter in word:
+			if tile in letter_placements:
+				self.board.place(tile, letter, self.letters_points[letter_placements[tile]])
+			tile = self.board.getPosition(tile, 1, direction)
+		# update cross-checks around the new tiles
+		self.cross_checks.update(letter_placements.keys(), journal)
+
+
+	# get next optimal move, searched across the processes of pool (a parallel.MovePool) if given.
+	# positions already searched under the same rules are answered from the rules' move cache.
+	# the search is counted and timed into stats (a stats.SearchStats) if given
+	def getOptimalMove(self, pool=None, stats=None):
+		if stats is None:
+			return self._getOptimalMove(pool)
+		self.stats = stats
+		try:
+			return stats.run(self._getOptimalMove, pool)
+		finally:
+			self.stats = None
+
+
+	# get next optimal move, from the move cache or searched
+	def _getOptimalMove(self, pool):
+		# position already searched by a game under the same rules
+		optimalMap = self.rules.move_cache.get(self)
+		if optimalMap is not None:
+			if self.stats is not None: self.stats.count('cache_hits')
+			return optimalMap
+		if pool is not None:
+			optimalMap = pool.getOptimalMove(self)
+		else:
+			optimalMap = self._searchOptimalMove()
+		self.rules.move_cache.put(self, optimalMap)
+		return optimalMap
+
+
+	# search next optimal move
+	def _searchOptimalMove(self):
 		optimalMap = {}
 		optimalMap['points'] = 0
 		optimalMap['words'] = []
-		letters_in_hand = self.player_data[self.player]['letters_in_hand']
+		rack = self.player_data[self.player]['rack']
+		# get optimal words and points, skipping placements that cannot reach the best points found so far
+		generator = MoveGenerator(self)
+		generator.threshold = 0
+		self._getOptimalPlacement(optimalMap, self._getScoredPlacements(rack, generator), generator)
+		return optimalMap
+
 
+	# yield every move of the current player as (points, word, tile, direction, letters_used), in search order.
+	# only moves scoring at least threshold if given. the game must not change until the generator is done.
+	def iterMoves(self, threshold=None):
+		generator = MoveGenerator(self)
+		generator.threshold = threshold
+		return self._getMoves(generator, threshold)
+
+
+	# yield moves of the current player found by generator, only those scoring at least threshold if given
+	def _getMoves(self, generator, threshold):
+		rack = self.player_data[self.player]['rack']
+		for points, move in self._getScoredPlacements(rack, generator, True):
+			if threshold is None or points >= threshold:
+				yield (points,) + move.asTuple(self.board)
+
+
+	# get the n best moves of the current player (as iterMoves), highest points first, ties in search order
+	def getTopMoves(self, n, threshold=None):
+		if n <= 0:
+			return []
+		heap = []
+		generator = MoveGenerator(self)
+		generator.threshold = threshold
+		for seq, move in enumerate(self._getMoves(generator, threshold)):
+			entry = (move[0], -seq, move)
+			if len(heap) < n:
+				heapq.heappush(heap, entry)
+			elif entry > heap[0]:
+				heapq.heapreplace(heap, entry)
+			# once full, only moves scoring at least the lowest kept can still enter
+			if len(heap) == n and (threshold is None or heap[0][0] > threshold):
+				generator.threshold = heap[0][0]
+		heap.sort(reverse=True)
+		return [move for points, seq, move in heap]
+
+
+	# yield (points, move) of every valid placement creatable from rack, searched by generator. openings come
+	# scored, from _getOpenings with every_opening or else only at their best offsets across from
+	# _getCreatableWords; other placements are scored once found
+	def _getScoredPlacements(self, rack, generator, every_opening=False):
+		if not self.board.tile_count:
+			if every_opening:
+				return self._getOpenings(self.board.center, rack)
+			return iter(self._getCreatableWords(self.board.center, rack))
+		return self._scorePlacements(self._getPlacements(rack, generator), rack)
+
+
+	# yield valid placements as moves creatable from rack, searched by generator
+	def _getPlacements(self, rack, generator):
 		# no tiles or words in play
-		if not self.tiles_in_play:
+		if not self.board.tile_count:
 			if DEBUG: print '== checking no tiles or words in play =='
-			valid_placements = self._getCreatableWords(self.center_tile, letters_in_hand)
-			if valid_placements:
-				# get optimal words and points
-				self._getOptimalPlacement(optimalMap, valid_placements, letters_in_hand)
-		else:
-			# check current tiles in play
-			if DEBUG: print '== checking current tiles in play =='
-			for tile in self.tiles_in_play:
-				if not (self.tiles_in_play[tile][ACROSS] and self.tiles_in_play[tile][DOWN]):
-					pivot = self.tiles_in_play[tile]['letter']
-					possible_words = self.possible_words[pivot]
-					for word in possible_words:
-						if not self.tiles_in_play[tile][ACROSS]: direction = ACROSS
-						else: direction = DOWN
-						valid_placements = self._checkPlacement(pivot, word, tile, direction, letters_in_hand)
-						if valid_placements:
-							# get optimal words and points
-							self._getOptimalPlacement(optimalMap, valid_placements, letters_in_hand)
-			
-			# check current words in play
-			if DEBUG: print '== checking current words in play =='
-			valid_placements = []
-			for word_played in self.words_in_play:
-				word_dict = self.possible_words[self.words_in_play[word_played]['shortest']]
-				word_list = []
-				for word in word_dict:
-					if word_played != word and word_played in word:
-						word_list.append(word)
-				# go through sub list of possible words
-				for word in word_list:
-					for placement_key in self.words_in_play[word_played]['placements']:
-						tile, direction = placement_key.split(';')
-						valid_word_placements = self._checkPlacement(word_played, word, tile, direction, letters_in_hand)
-						if valid_word_placements:
-							for w, t, d, l in valid_word_placements:
-								# if letters used == 1, check for additional possible words to make on new pivot
-								if len(l) == 1:
-									pivot_index = word.find(word_played)
-									if (pivot_index == 0):
-										sub_pivot = word[len(word_played)]
-										sub_tile = self._getPosition(t, len(word_played), direction)
-									else:
-										sub_pivot = word[pivot_index-1]
-										sub_tile = self._getPosition(t, pivot_index-1, direction)
-									sub_direction = self._getOtherDirection(direction)
-									sub_dict = self.possible_words[sub_pivot]
-									for sub_word in sub_dict:
-										sub_placements = self._checkPlacement(sub_pivot, sub_word, sub_tile, sub_direction, letters_in_hand)
-										if sub_placements:
-											for sw, st, sd, sl in sub_placements:
-												sl.sort()
-												if (sw, st, sd, sl) not in valid_placements:
-													valid_placements.append((sw, st, sd, sl))
-								l.sort()
-								if (w, t, d, l) not in valid_placements:
-									valid_placements.append((w, t, d, l))
-			# get optimal words and points
-			self._getOptimalPlacement(optimalMap, valid_placements, letters_in_hand)
-		return optimalMap
+			for points, placement in self._getOpenings(self.board.center, rack):
+				yield placement
+			return
+		# search every anchor square in both directions
+		if DEBUG: print '== checking anchor squares =='
+		for word, tile, direction, letters_needed in generator.generate(rack):
+			yield Move(word, tile, direction, rack.lettersUsed(letters_needed))
 
 
-	# get all creatable words from letters in hand
-	def _getCreatableWords(self, start_tile, letters_in_hand):
+	# get (points, move) of all creatable words from letters in hand, placed across start_tile at their best offsets
+	def _getCreatableWords(self, start_tile, rack):
 		creatable_words = []
-		for word in self.dictionary:
-			letters_used = self._letterCheck(word, letters_in_hand)
-			if letters_used:
-				if len(word) > 4:
-					for i in range (0, len(word)):
-						creatable_words.append((word, self._getPosition(start_tile, -i, ACROSS), ACROSS, letters_used))
-				else:
-					creatable_words.append((word, start_tile, ACROSS, letters_used))
+		letters = [l for l in rack.letters() if l != 'blank']
+		for word in self.lexicon.findAnagrams(letters, rack.counts[BLANK]):
+			letters_used = rack.lettersUsed(word)
+			if not letters_used:
+				if self.stats is not None: self.stats.reject('rack')
+				continue
+			# words up to 4 letters are only placed starting at start_tile
+			if len(word) > 4: offsets = range(0, len(word))
+			else: offsets = [0]
+			best_points = -1
+			best_tiles = []
+			for i in offsets:
+				tile = self.board.getPosition(start_tile, -i, ACROSS)
+				if tile is None or self.board.getPosition(tile, len(word) - 1, ACROSS) is None:
+					if self.stats is not None: self.stats.reject('boundary')
+					continue
+				points = self._getOpeningScore(rack, word, tile)
+				if self.stats is not None: self.stats.count('scored')
+				if points > best_points:
+					best_points = points
+					best_tiles = [tile]
+				elif points == best_points:
+					best_tiles.append(tile)
+			for tile in best_tiles:
+				creatable_words.append((best_points, Move(word, tile, ACROSS, letters_used)))
 		return creatable_words
 
 
-	# returns letters_used if letters_needed is a subset of letters_in_hand, False otherwise.
-	def _letterCheck(self, letters_needed, letters_in_hand):
-		letters_used = []
-		if len(letters_in_hand) < len(letters_needed):
-			return False
-		tmpletters = list(letters_in_hand)
-		for l in letters_needed:
-			if not letters_needed.count(l) <= tmpletters.count(l):
-				# check blanks
-				if 'blank' in tmpletters:
-					if (letters_needed.count(l) - tmpletters.count(l)) <= tmpletters.count('blank'):
-						tmpletters.remove('blank')
-						tmpletters.append(l)
-						letters_used.append('blank')
+	# yield (points, move) of all creatable words from letters in hand, placed across and down at every offset
+	# covering start_tile
+	def _getOpenings(self, start_tile, rack):
+		letters = [l for l in rack.letters() if l != 'blank']
+		for word in self.lexicon.findAnagrams(letters, rack.counts[BLANK]):
+			letters_used = rack.lettersUsed(word)
+			if not letters_used:
+				continue
+			for direction in (ACROSS, DOWN):
+				for i in range(0, len(word)):
+					tile = self.board.getPosition(start_tile, -i, direction)
+					if tile is None or self.board.getPosition(tile, len(word) - 1, direction) is None:
 						continue
-				# not possible
-				return False
-			letters_used.append(l)
-		return letters_used
-
-
-	# find optimal placement from list of valid placements
-	def _getOptimalPlacement(self, optimalMap, valid_placements, letters_in_hand):
-		for w, t, d, l in valid_placements:
-			l.sort()
-			if (w, t, d, l) not in optimalMap['words']:
-				# optimize letter placement
-				letter_placements = self._optimizeLetters(letters_in_hand, w, t, d, l)
-				if letter_placements:
-					points = self._checkWordScore(letter_placements, w, t, d)
-					if DEBUG: print '\tPOINTS: '+str(points)+'\tWORD: '+str(w)+'\tTILE: '+str(t)+'\tDIR: '+str(d)+'\tLETTERS_USED: '+str(l)
-					if points > optimalMap['points']:
-						del optimalMap['words'][:]
-						optimalMap['words'].append((w, t, d, l))
-						optimalMap['points'] = points
-					elif points == optimalMap['points']:
-						optimalMap['words'].append((w, t, d, l))
-
-
-	# check all possible placements of a word around pivot
-	def _checkPlacement(self, pivot, word, tile, direction, letters_in_hand):
-		valid_placements = []
-		start_pos = 0
-		end_pos = len(word)
-		# find position of each pivot in the word
-		for i in range(0, word.count(pivot)):
-			letters_needed = []
-			pivot_pos = word.find(pivot, start_pos, end_pos)
-			start_tile = self._getPosition(tile, 0-pivot_pos, direction)
-			# check if placement is valid
-			validPlacement = self._validatePlacement(word, start_tile, direction, letters_in_hand)
-			if validPlacement: valid_placements.extend(validPlacement)
-			start_pos = pivot_pos + 1
-		return valid_placements
+					yield self._getOpeningScore(rack, word, tile, direction), Move(word, tile, direction, letters_used)
+
+
+	# score word placed in direction (across if not given) on an empty board from rack straight from the premium
+	# arrays, as _optimizeLetters and _checkWordScore would: blanks stand for the copies of a letter missing from
+	# rack, on the squares where that letter is worth least
+	def _getOpeningScore(self, rack, word, tile, direction=ACROSS):
+		values = []
+		multiplier = 1
+		for letter in word:
+			values.append(self.letters_points[letter] * self.board.letter_multiplier[tile])
+			multiplier *= self.board.word_multiplier[tile]
+			tile = self.board.getPosition(tile, 1, direction)
+		if rack.counts[BLANK]:
+			for letter in set(word):
+				missing = word.count(letter) - rack.counts[TILE_INDEX[letter]]
+				if missing > 0:
+					for value, i in sorted((values[i], i) for i in range(0, len(word)) if word[i] == letter)[:missing]:
+						values[i] = 0
+		points = sum(values) * multiplier
+		# 7 letters used, 50 point bonus!
+		if len(word) == 7:
+			points += 50
+		return points
+
+
+	# find optimal placement from scored placements ((points, move) pairs), raising the threshold of the
+	# generator searching them if given
+	def _getOptimalPlacement(self, optimalMap, scored_placements, generator=None):
+		for points, move in scored_placements:
+			if points > optimalMap['points']:
+				del optimalMap['words'][:]
+				optimalMap['words'].append(move.asTuple(self.board))
+				optimalMap['points'] = points
+				if generator is not None: generator.threshold = points
+			elif points == optimalMap['points']:
+				optimalMap['words'].append(move.asTuple(self.board))
+
+
+	# yield (points, move) for each valid placement (a move) whose letters can be placed, scored as it is found
+	def _scorePlacements(self, valid_placements, rack):
+		stats = self.stats
+		if stats is not None:
+			valid_placements = stats.timeIter('generate', valid_placements)
+		for move in valid_placements:
+			w, t, d = move.word, move.tile, move.direction
+			# optimize letter placement
+			if stats is None:
+				letter_placements = self._optimizeLetters(rack, w, t, d, list(move.letters_used))
+				if not letter_placements: continue
+				points = self._checkWordScore(letter_placements, w, t, d)
+			else:
+				start = time.time()
+				letter_placements = self._optimizeLetters(rack, w, t, d, list(move.letters_used))
+				stats.addTime('optimize', time.time() - start)
+				if not letter_placements:
+					stats.reject('letters')
+					continue
+				start = time.time()
+				points = self._checkWordScore(letter_placements, w, t, d)
+				stats.addTime('score', time.time() - start)
+				stats.count('scored')
+			if DEBUG: print '\tPOINTS: '+str(points)+'\tWORD: '+str(w)+'\tTILE: '+self.board.getTile(t)+'\tDIR: '+str(d)+'\tLETTERS_USED: '+str(list(move.letters_used))
+			yield points, move
 
 
 	# check whether a word can be placed in direction from start_tile, if enough letters to create, and if extends miminum 1 current letter on board
-	def _validatePlacement(self, word, start_tile, direction, letters_in_hand):
+	def _validatePlacement(self, word, start_tile, direction, rack):
 		# start of word exceeds board size, discard rest of checking
-		if not start_tile: return False
+		if start_tile is None: return False
 
 		valid_placements = []
 		letters_needed = []
-		other_direction = self._getOtherDirection(direction)
 		validPlacement = True
 		validPosition = False
 		letter_pos = 0
 		# try and build the word, check letters
 		while letter_pos < len(word):
-			tile_pos = self._getPosition(start_tile, letter_pos, direction)
+			tile_pos = self.board.getPosition(start_tile, letter_pos, direction)
 			# case when board is empty
-			if tile_pos == self.center_tile: validPosition = True
+			if tile_pos == self.board.center: validPosition = True
 
-			if not tile_pos:
+			if tile_pos is None:
 				# word too long; exceeds board size, break
 				validPlacement = False
 				break
-			elif tile_pos in self.tiles_in_play:
+			elif self.board.letters[tile_pos]:
 				validPosition = True
 				# a different letter already on the board, break
-				if self.tiles_in_play[tile_pos]['letter'] != word[letter_pos]:
+				if self.board.getLetter(tile_pos) != word[letter_pos]:
 					validPlacement = False
 					break
 				# letter is already on the board, continue
@@ -443,12 +397,12 @@ class Scrabble:
 					letter_pos += 1
 					continue
 			else:
-				# check surrounding letters to see if side word is created
-				side_word = self._checkSideWord(tile_pos, word[letter_pos], other_direction)
-				if side_word:
+				# check cached cross-checks to see if side word is created
+				allowed = self.cross_checks.allowed[direction][tile_pos]
+				if allowed is not None:
 					validPosition = True
 					# side word is not valid, break
-					if not self._checkWord(side_word['word']):
+					if word[letter_pos] not in allowed:
 						validPlacement = False
 						break
 				# add current letter to letter check
@@ -457,7 +411,7 @@ class Scrabble:
 		# tile placement is valid
 		if validPlacement and validPosition:
 			# check if player has enough letters and if boundaries are clean
-			letters_used = self._letterCheck(letters_needed, letters_in_hand)
+			letters_used = rack.lettersUsed(letters_needed)
 			if letters_used and self._boundaryCheck(len(word), start_tile, direction):
 				# word is good, add (word, tile, direction, letters_used) tuple to return
 				valid_placements.append((word, start_tile, direction, letters_used))
@@ -466,66 +420,67 @@ class Scrabble:
 
 	# check whether word exists in dictionary
 	def _checkWord(self, word):
-		return word in self.dictionary
+		return word in self.lexicon
 
 
 	# check whether letter exists before and after word
 	def _boundaryCheck(self, word_length, tile, direction):
-		prev_pos = self._getPosition(tile, -1, direction)
-		if prev_pos and prev_pos in self.tiles_in_play: return False
-		next_pos = self._getPosition(tile, word_length, direction)
-		if next_pos and next_pos in self.tiles_in_play: return False
+		prev_pos = self.board.getPosition(tile, -1, direction)
+		if prev_pos is not None and self.board.letters[prev_pos]: return False
+		next_pos = self.board.getPosition(tile, word_length, direction)
+		if next_pos is not None and self.board.letters[next_pos]: return False
 		return True
 
 
 	# optimize placement of letters
-	def _optimizeLetters(self, letters_in_hand, word, tile, direction, letters_used):
+	def _optimizeLetters(self, rack, word, tile, direction, letters_used):
 		letter_placements = {}
-		tmpletters = list(letters_in_hand)
-		other_direction = self._getOtherDirection(direction)
+		taken = []
 		for i in range(0, len(word)):
 			letter = word[i]
 			# letter already exists on board
-			if tile in self.tiles_in_play:
+			if self.board.letters[tile]:
 				# ERROR: letter in word doesn't match letter on board (should have failed placement check)
-				if self.tiles_in_play[tile]['letter'] != letter:
-					return False
-				tile = self._getPosition(tile, 1, direction)
+				if self.board.getLetter(tile) != letter:
+					letter_placements = False
+					break
+				tile = self.board.getPosition(tile, 1, direction)
 				continue
 			# choose which letter from hand to use for optimal points
-			if letter in tmpletters:
-				letter_used = letter
-				if 'blank' in tmpletters:
-					remaining_word = word[i:]
-					if remaining_word.count(letter) > tmpletters.count(letter):
-						if self._useBlankTile(remaining_word, letter, tile, direction):
-							letter_used = 'blank'
+			index = TILE_INDEX[letter]
+			if rack.counts[index]:
+				letter_used = index
+				if rack.counts[BLANK] and self._useBlankTile(word[i:], letter, tile, direction, rack.counts[index]):
+					letter_used = BLANK
 			# use a blank letter tile
-			elif 'blank' in tmpletters:
-				letter_used = 'blank'
+			elif rack.counts[BLANK]:
+				letter_used = BLANK
 			# ERROR: impossible to create word (should have failed placement check)
 			else:
-				return False
+				letter_placements = False
+				break
 			# update tile pos
-			tmpletters.remove(letter_used)
-			letter_placements[tile] = letter_used
-			tile = self._getPosition(tile, 1, direction)
+			rack.take(letter_used)
+			taken.append(letter_used)
+			letter_placements[tile] = 'blank' if letter_used == BLANK else letter
+			tile = self.board.getPosition(tile, 1, direction)
+		# put letters back into rack
+		for index in taken: rack.put(index)
 		return letter_placements
 
 
 	# find the score of a word placement
 	def _checkWordScore(self, letter_placements, word, tile, direction):
-		other_direction = self._getOtherDirection(direction)
 		main_multiplier = 1
 		main_points = side_points = bonus_points = 0
 		for i in range(0, len(word)):
 			# letter already exists on board, grab letter face value
-			if tile in self.tiles_in_play:
+			if self.board.letters[tile]:
 				# ERROR: letter in word doesn't match letter on board (should have failed placement check)
-				if self.tiles_in_play[tile]['letter'] != word[i]:
+				if self.board.getLetter(tile) != word[i]:
 					return 0
-				main_points += self.tiles_in_play[tile]['points']
-				tile = self._getPosition(tile, 1, direction)
+				main_points += self.board.points[tile]
+				tile = self.board.getPosition(tile, 1, direction)
 				continue
 			# grab letter from letter_placements
 			elif tile in letter_placements:
@@ -534,23 +489,18 @@ class Scrabble:
 			else:
 				return 0
 			# get current letter points and remove letter used from hand
-			current_letter_points = self.letters_points[letter_used] * self._getLetterMultiplier(tile)
+			current_letter_points = self.letters_points[letter_used] * self.board.letter_multiplier[tile]
 			# update word multiplier
-			current_multiplier = self._getWordMultiplier(tile)
+			current_multiplier = self.board.word_multiplier[tile]
 			main_multiplier *= current_multiplier
 			# get side points
-			current_side_points = 0
-			prev_tile_pos = self._getPosition(tile, -1, other_direction)
-			next_tile_pos = self._getPosition(tile, 1, other_direction)
-			if prev_tile_pos in self.tiles_in_play or next_tile_pos in self.tiles_in_play:
-				current_side_points += self._getTileScore(prev_tile_pos, -1, other_direction)
-				current_side_points += self._getTileScore(next_tile_pos, 1, other_direction)
-				current_side_points += current_letter_points
+			if self.cross_checks.allowed[direction][tile] is not None:
+				current_side_points = self.cross_checks.side_points[direction][tile] + current_letter_points
 				side_points += current_side_points * current_multiplier
 			# update main_points
 			main_points += current_letter_points
 			# update tile pos
-			tile = self._getPosition(tile, 1, direction)
+			tile = self.board.getPosition(tile, 1, direction)
 		# apply main multiplier to main points
 		main_points *= main_multiplier
 		# 7 letters used, 50 point bonus!
@@ -559,79 +509,42 @@ class Scrabble:
 		return main_points + side_points + bonus_points
 
 
-	# choose whether to use regular or blank tile
-	def _useBlankTile(self, remaining_word, letter, tile, direction):
-		other_direction = self._getOtherDirection(direction)
-		current_bonus = self._getTileBonus(tile, other_direction)
+	# choose whether to use regular or blank tile: blank when the real copies of letter left in hand are all
+	# needed further on, on squares with a higher bonus
+	def _useBlankTile(self, remaining_word, letter, tile, direction, real):
+		current_bonus = self._getTileBonus(tile, direction)
+		needed = higher = 0
 		for l in remaining_word[1:]:
-			tile = self._getPosition(tile, 1, direction)
-			if l == letter and tile not in self.tiles_in_play:
-				future_bonus = self._getTileBonus(tile, other_direction)
-				if future_bonus > current_bonus:
-					return True
-		return False
+			tile = self.board.getPosition(tile, 1, direction)
+			if l == letter and not self.board.letters[tile]:
+				needed += 1
+				if self._getTileBonus(tile, direction) > current_bonus:
+					higher += 1
+		return needed >= real and higher >= real
 
 
 	# get tile bonus based on tile multiplier and how many words it is in
-	def _getTileBonus(self, tile, other_direction):
-		if self._tileInTwoWords(tile, other_direction):
-			if self._tileIsLetterMultiplier(tile):
-				return self._getLetterMultiplier(tile) * 2
-			elif self._tileIsWordMultiplier(tile): 
-				return self._getWordMultiplier(tile)
+	def _getTileBonus(self, tile, direction):
+		letter_multiplier = self.board.letter_multiplier[tile]
+		if self._tileInTwoWords(tile, direction):
+			if letter_multiplier > 1:
+				return letter_multiplier * 2
+			elif self.board.word_multiplier[tile] > 1:
+				return self.board.word_multiplier[tile]
 		else:
-			if self._tileIsLetterMultiplier(tile): 
-				return self._getLetterMultiplier(tile)
+			if letter_multiplier > 1:
+				return letter_multiplier
 		return 1
 
 
 	# check whether a tile is part of two words (across and down)
-	def _tileInTwoWords(self, tile, other_direction):
-		before = self._getPosition(tile, -1, other_direction)
-		after = self._getPosition(tile, 1, other_direction)
-		if before in self.tiles_in_play or after in self.tiles_in_play:
-			return True
-		return False
-
-
-	# check whether tile is a letter multiplier
-	def _tileIsLetterMultiplier(self, tile):
-		if tile in self.triple_letter or tile in self.double_letter: return True
-		return False
-
-
-	# check whether tile is a word multiplier
-	def _tileIsWordMultiplier(self, tile):
-		if tile in self.triple_word or tile in self.double_word: return True
-		return False
-
-
-	# return letter multiplier
-	def _getLetterMultiplier(self, tile):
-		if tile in self.triple_letter: return 3
-		elif tile in self.double_letter: return 2
-		return 1
-
-
-	# return word multiplier
-	def _getWordMultiplier(self, tile):
-		if tile in self.triple_word: return 3
-		elif tile in self.double_word: return 2
-		return 1
-
-
-	# return accumulative score from adjacent tiles in a direction
-	def _getTileScore(self, tile, length, direction):
-		tile_score = 0
-		while tile in self.tiles_in_play:
-			tile_score += self.tiles_in_play[tile]['points']
-			tile = self._getPosition(tile, length, direction)
-		return tile_score
+	def _tileInTwoWords(self, tile, direction):
+		return self.cross_checks.allowed[direction][tile] is not None
 
 
 	# return current letters in hand
 	def getLetters(self):
-		return self.player_data[self.player]['letters_in_hand']
+		return self.player_data[self.player]['rack'].letters()
 
 
 	# return current player score
@@ -663,19 +576,19 @@ class Scrabble:
 					else: output += '  |'
 				else: output += '    |'
 				for col in range(0, self.board_size):
-					tile = str(row) + '-' + str(col)
+					tile = row * self.board_size + col
 					if i == 1: output += '____|'
-					elif tile in self.tiles_in_play:
+					elif self.board.letters[tile]:
 						output += bold
-						output += self.tiles_in_play[tile]['letter'].upper()
-						if self.tiles_in_play[tile]['points'] == 0:
+						output += self.board.getLetter(tile).upper()
+						if self.board.points[tile] == 0:
 							output = output+'?'+reset
 						else: output = output+reset+' '
 						output += '  |'
-					elif tile in self.double_letter: output += '*   |'
-					elif tile in self.triple_letter: output += '#   |'
-					elif tile in self.double_word: output += 'x2  |'
-					elif tile in self.triple_word: output += 'x3  |'
+					elif self.board.letter_multiplier[tile] == 2: output += '*   |'
+					elif self.board.letter_multiplier[tile] == 3: output += '#   |'
+					elif self.board.word_multiplier[tile] == 2: output += 'x2  |'
+					elif self.board.word_multiplier[tile] == 3: output += 'x3  |'
 					else: output += '    |'
 				output += '\n'
 		return output
@@ -683,28 +596,82 @@ class Scrabble:
 
 	# place a word onto the board. return word score if successful, false otherwise.
 	def placeWord(self, word, tile, direction):
+		return self._placeWord(word, tile, direction, None)
+
+
+	# place a word as placeWord does, keeping what is needed to take it back with undoMove
+	def applyMove(self, word, tile, direction):
+		move = {}
+		move['player_index'] = self.player_index
+		move['score'] = self.player_data[self.player]['score']
+		move['scoreless_turns'] = self.scoreless_turns
+		move['random'] = self.bag.random.getstate()
+		move['cross_checks'] = []
+		move['drawn'] = []
+		word_score = self._placeWord(word, tile, direction, move)
+		if word_score is not False:
+			self.moves_applied.append(move)
+		return word_score
+
+
+	# pass turn as passTurn does, to be taken back with undoMove
+	def applyPass(self):
+		move = {}
+		move['player_index'] = self.player_index
+		move['scoreless_turns'] = self.scoreless_turns
+		self.passTurn()
+		self.moves_applied.append(move)
+
+
+	# take back the last move of applyMove or applyPass: board, cross-checks, rack, bag, score and player
+	def undoMove(self):
+		move = self.moves_applied.pop()
+		self.player_index = move['player_index']
+		self.player = self.player_list[self.player_index]
+		self.scoreless_turns = move['scoreless_turns']
+		if 'placed' not in move:
+			return
+		rack = self.player_data[self.player]['rack']
+		for i, l in move['drawn']: rack.remove(l)
+		for l in move['letters_used']: rack.add(l)
+		self.bag.undraw(move['drawn'], move['random'])
+		for square in move['placed']: self.board.unplace(square)
+		self.cross_checks.undo(move['cross_checks'])
+		self.player_data[self.player]['score'] = move['score']
+
+
+	# place a word onto the board, recording placed tiles, letters used and journals of cross-checks and draws to move if given
+	def _placeWord(self, word, tile, direction, move):
 		# check if word is valid word
 		if not self._checkWord(word):
 			return False
+		# convert tile to board square
+		tile = self.board.getIndex(tile)
 		# check placement (check whether word can be placed, and if user has enough letters)
-		letters_in_hand = self.player_data[self.player]['letters_in_hand']
-		valid_placements = self._validatePlacement(word, tile, direction, letters_in_hand)
+		rack = self.player_data[self.player]['rack']
+		valid_placements = self._validatePlacement(word, tile, direction, rack)
 		if not valid_placements:
 			return False
 		# get letter placement (TODO: should not auto optimize for users, will provide letter_placement if UI is made)
 		w, t, d, letters_used = valid_placements[0]
-		letter_placements = self._optimizeLetters(letters_in_hand, w, t, d, letters_used)
+		letter_placements = self._optimizeLetters(rack, w, t, d, letters_used)
 		if not letter_placements:
 			return False
 		# get score
 		word_score = self._checkWordScore(letter_placements, w, t, d)
 		self.player_data[self.player]['score'] += word_score
+		self.scoreless_turns = 0 if word_score else self.scoreless_turns + 1
 		# place word
-		self._addWordInPlay(letter_placements, w, t, d)
+		if move is None:
+			self._addWordInPlay(letter_placements, w, t, d)
+		else:
+			move['placed'] = letter_placements.keys()
+			move['letters_used'] = letters_used
+			self._addWordInPlay(letter_placements, w, t, d, move['cross_checks'])
 		# discard letters used
-		for l in letters_used: self.player_data[self.player]['letters_in_hand'].remove(l)
+		for l in letters_used: rack.remove(l)
 		# get new tiles
-		self._getTiles(self.player)
+		self._getTiles(self.player, None if move is None else move['drawn'])
 		# switch to next player
 		self.nextPlayer()
 		return word_score
@@ -714,27 +681,56 @@ class Scrabble:
 	def exchangeTiles(self, exchange_tiles):
 		# make sure player has the exchange tiles
 		for l in exchange_tiles:
-			if exchange_tiles.count(l) > self.player_data[self.player]['letters_in_hand'].count(l):
+			if exchange_tiles.count(l) > self.player_data[self.player]['rack'].count(l):
 				return False
 		# make sure enough tiles remaining to do exchange
-		if len(exchange_tiles) > self.letters_remaining: return False
+		if len(exchange_tiles) > len(self.bag): return False
 		# remove tiles from player
-		for l in exchange_tiles: self.player_data[self.player]['letters_in_hand'].remove(l)
+		for l in exchange_tiles: self.player_data[self.player]['rack'].remove(l)
 		# get new tiles
 		self._getTiles(self.player)
 		# put back exchange_tiles
 		self._insertTiles(exchange_tiles)
+		self.scoreless_turns += 1
 		# switch to next player
 		self.nextPlayer()
 		return True
 
 
+	# pass turn without playing
+	def passTurn(self):
+		self.scoreless_turns += 1
+		self.nextPlayer()
+
+
+	# check whether game is over: a player has played out all tiles with the bag empty, or scoreless_limit
+	# scoreless turns were taken in a row
+	def isGameOver(self, scoreless_limit=SCORELESS_LIMIT):
+		if self.scoreless_turns >= scoreless_limit:
+			return True
+		if len(self.bag):
+			return False
+		return any(not len(self.player_data[player]['rack']) for player in self.player_list)
+
+
+	# return final score of each player: points of tiles left in hand are taken off, and a player who went
+	# out gets the points left in every other hand
+	def getFinalScores(self):
+		scores = {}
+		remaining = {}
+		for player in self.player_list:
+			rack = self.player_data[player]['rack']
+			remaining[player] = sum(self.letters_points[l] for l in rack.letters())
+			scores[player] = self.player_data[player]['score'] - remaining[player]
+		for player in self.player_list:
+			if not len(self.player_data[player]['rack']):
+				scores[player] += sum(remaining.values())
+		return scores
+
+
 	# insert tiles back into play
 	def _insertTiles(self, exchange_tiles):
-		for l in exchange_tiles:
-			if l not in self.letters: self.letters[l] = 1
-			else: self.letters[l] += 1
-		self.letters_remaining += len(exchange_tiles)
+		self.bag.insert(exchange_tiles)
 
 
 	# switch to next player
@@ -789,7 +785,7 @@ if __name__ == '__main__':
 				print 'optimal: '+str(optimal)
 			# pass your turn
 			elif (cmd == 'pass'):
-				scrabble.nextPlayer()
+				scrabble.passTurn()
 				break
 			# exchange tiles
 			elif (cmd == 'exchange'):
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import sys
+import time
+import json
+import random
+import argparse
+import multiprocessing
+from scrabble import Scrabble, CONFIG_FILE, DICTIONARY_FILE, SCORELESS_LIMIT
+from simulate import Simulator
+from rules import Rules
+
+# global variables
+SIMULATION_CANDIDATES = 5
+SIMULATION_ITERATIONS = 8
+
+# per-process worker state: rules and config file, loaded once when the pool starts
+_worker = {'rules': None, 'config_file': None}
+
+
+# play the first optimal move
+def _greedyMove(scrabble, rng):
+	words = scrabble.getOptimalMove()['words']
+	if not words:
+		return None
+	return words[0][:3]
+
+
+# play any valid move
+def _randomMove(scrabble, rng):
+	moves = list(scrabble.iterMoves())
+	if not moves:
+		return None
+	return rng.choice(moves)[1:4]
+
+
+# play the move of highest equity over simulated replies
+def _simulationMove(scrabble, rng):
+	simulator = Simulator(scrabble, SIMULATION_CANDIDATES, seed=rng.getrandbits(32))
+	results = simulator.simulate(iterations=SIMULATION_ITERATIONS)
+	if not results:
+		return None
+	return results[0][1][1:4]
+
+
+# strategies by name: each returns the (word, tile, direction) to play for the current player, None to pass
+STRATEGIES = {
+	'greedy': _greedyMove,
+	'random': _randomMove,
+	'simulation': _simulationMove,
+}
+
+
+# play one game of strategies (one per player) seeded by seed, under rules, return its result
+def playGame(strategies, seed, rules, config_file=None, scoreless_limit=SCORELESS_LIMIT):
+	start = time.time()
+	rng = random.Random(seed)
+	scrabble = Scrabble(len(strategies), config_file, rules=rules, seed=seed)
+	seats = dict(zip(scrabble.player_list, strategies))
+	moves = []
+	while not scrabble.isGameOver(scoreless_limit):
+		player = scrabble.getPlayer()
+		move_start = time.time()
+		move = STRATEGIES[seats[player]](scrabble, rng)
+		seconds = time.time() - move_start
+		if move is None:
+			scrabble.passTurn()
+			moves.append({'player': player, 'pass': True, 'points': 0, 'seconds': seconds})
+			continue
+		word, tile, direction = move
+		points = scrabble.placeWord(word, tile, direction)
+		if points is False:
+			raise ValueError('strategy ' + seats[player] + ' chose an invalid move: ' + str(move))
+		moves.append({'player': player, 'word': word, 'tile': tile, 'direction': direction, 'points': points, 'seconds': seconds})
+	result = {}
+	result['seed'] = seed
+	result['strategies'] = seats
+	result['scores'] = scrabble.getFinalScores()
+	result['points'] = dict((p, scrabble.player_data[p]['score']) for p in scrabble.player_list)
+	result['racks'] = dict((p, scrabble.player_data[p]['rack'].letters()) for p in scrabble.player_list)
+	result['turns'] = len(moves)
+	result['moves'] = moves
+	result['seconds'] = time.time() - start
+	return result
+
+
+# set rules of a worker process, once when the pool starts
+def _initWorker(config_file, dictionary_file):
+	_worker['rules'] = Rules.fromFile(config_file, dictionary_file)
+	_worker['config_file'] = config_file
+
+
+# play one game of a task in a worker process
+def _playTask(task):
+	strategies, seed, scoreless_limit = task
+	return playGame(strategies, seed, _worker['rules'], _worker['config_file'], scoreless_limit)
+
+
+class Tournament:
+	'''
+	Headless self-play: games between strategies (names of STRATEGIES, one per player) played across a
+	process pool. Game number i is seeded with seed + i, so every game can be replayed alone with playGame, and
+	strategies rotate seats from one game to the next so none always moves first. Results come back in game
+	order as they finish and are written one JSON object per line.
+
+	Each worker loads the rules once. A game ends when a player goes out with the bag empty or after
+	scoreless_limit turns in a row without points; final scores take the tiles left in hand into account.
+	'''
+
+	def __init__(self, strategies, games, seed=0, processes=None, config_file=CONFIG_FILE, dictionary_file=DICTIONARY_FILE, scoreless_limit=SCORELESS_LIMIT):
+		for strategy in strategies:
+			if strategy not in STRATEGIES:
+				raise ValueError('unknown strategy: ' + str(strategy))
+		self.strategies = list(strategies)
+		self.games = games
+		self.seed = seed
+		self.processes = processes
+		self.config_file = config_file
+		self.dictionary_file = dictionary_file
+		self.scoreless_limit = scoreless_limit
+
+
+	# yield result of every game, in game order
+	def iterResults(self):
+		pool = multiprocessing.Pool(self.processes, _initWorker, (self.config_file, self.dictionary_file))
+		try:
+			for result in pool.imap(_playTask, self._getTasks()):
+				yield result
+			pool.close()
+		except:
+			pool.terminate()
+			raise
+		finally:
+			pool.join()
+
+
+	# play every game, writing results to output as JSON lines, return summary per strategy
+	def run(self, output):
+		summary = dict((s, {'games': 0, 'wins': 0, 'score': 0}) for s in self.strategies)
+		for result in self.iterResults():
+			output.write(json.dumps(result, sort_keys=True) + '\n')
+			output.flush()
+			best = max(result['scores'].values())
+			for player, strategy in result['strategies'].items():
+				summary[strategy]['games'] += 1
+				summary[strategy]['score'] += result['scores'][player]
+				if result['scores'][player] == best: summary[strategy]['wins'] += 1
+		return summary
+
+
+	# yield task of every game: strategies in seat order, seed and scoreless turns limit
+	def _getTasks(self):
+		size = len(self.strategies)
+		for game in range(0, self.games):
+			rotation = game % size
+			strategies = self.strategies[rotation:] + self.strategies[:rotation]
+			yield strategies, self.seed + game, self.scoreless_limit
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='play scrabble games between strategies')
+	parser.add_argument('strategies', nargs='+', choices=sorted(STRATEGIES), help='strategy of each player')
+	parser.add_argument('-n', '--games', type=int, default=100, help='number of games')
+	parser.add_argument('-s', '--seed', type=int, default=0, help='seed of the first game')
+	parser.add_argument('-p', '--processes', type=int, default=None, help='worker processes (default: all cores)')
+	parser.add_argument('-o', '--output', default='-', help='JSON lines output file (default: stdout)')
+	parser.add_argument('--config', default=CONFIG_FILE, help='config file')
+	parser.add_argument('--dictionary', default=DICTIONARY_FILE, help='dictionary file')
+	parser.add_argument('--scoreless-limit', type=int, default=SCORELESS_LIMIT, help='scoreless turns in a row ending a game')
+	args = parser.parse_args()
+
+	tournament = Tournament(args.strategies, args.games, args.seed, args.processes, args.config, args.dictionary, args.scoreless_limit)
+	output = sys.stdout if args.output == '-' else open(args.output, 'w')
+	start = time.time()
+	try:
+		summary = tournament.run(output)
+	finally:
+		if output is not sys.stdout: output.close()
+	seconds = time.time() - start
+	sys.stderr.write(str(args.games) + ' games in ' + ('%.1f' % seconds) + 's (' + ('%.2f' % (args.games / max(seconds, 1e-9))) + ' games/s)\n')
+	for strategy in sorted(summary):
+		stats = summary[strategy]
+		sys.stderr.write(strategy + ': ' + str(stats['wins']) + ' wins in ' + str(stats['games']) + ' games, ' + ('%.1f' % (float(stats['score']) / max(stats['games'], 1))) + ' points per game\n')
@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import os
+import sys
+import time
+import json
+import socket
+import argparse
+import asyncore
+import asynchat
+import collections
+import multiprocessing
+from scrabble import Scrabble, CONFIG_FILE, DICTIONARY_FILE
+from rules import Rules
+from parallel import initWorker, getWorkerRules
+import snapshot
+
+# global variables
+MAX_LINE = 64 * 1024
+MAX_PENDING = 4
+MAX_QUEUED = 64
+MAX_OUTPUT = 256 * 1024
+LATENCY_SAMPLES = 1024
+POLL_TIMEOUT = 0.5
+MAX_PLAYERS = 4
+
+
+# search the optimal move of a game saved by snapshot.dumps, return (optimalMap, None) or (None, error)
+def _searchOptimal(data):
+	try:
+		return snapshot.loads(data, getWorkerRules()).getOptimalMove(), None
+	except Exception as e:
+		return None, e.__class__.__name__ + ': ' + str(e)
+
+
+class Metrics:
+	'''
+	Per-command request counts, errors and latencies (seconds from a request line read to its response queued).
+	Only the last LATENCY_SAMPLES latencies of each command are kept for percentiles.
+	'''
+
+	def __init__(self):
+		self.commands = {}
+
+
+	# record one request of cmd taking seconds
+	def record(self, cmd, seconds, ok):
+		if cmd not in self.commands:
+			self.commands[cmd] = {'count': 0, 'errors': 0, 'total': 0.0, 'max': 0.0, 'samples': collections.deque(maxlen=LATENCY_SAMPLES)}
+		stats = self.commands[cmd]
+		stats['count'] += 1
+		if not ok: stats['errors'] += 1
+		stats['total'] += seconds
+		stats['max'] = max(stats['max'], seconds)
+		stats['samples'].append(seconds)
+
+
+	# return summary per command: count, errors, mean, 50th and 99th percentile and max latency
+	def getSummary(self):
+		summary = {}
+		for cmd, stats in self.commands.items():
+			samples = sorted(stats['samples'])
+			summary[cmd] = {
+				'count': stats['count'],
+				'errors': stats['errors'],
+				'mean': stats['total'] / stats['count'],
+				'p50': samples[len(samples) // 2],
+				'p99': samples[min(len(samples) - 1, len(samples) * 99 // 100)],
+				'max': stats['max'],
+			}
+		return summary
+
+
+class _Wakeup(asyncore.file_dispatcher):
+	'''
+	Read end of a pipe in the event loop: pool threads write a byte to it once they queued a result, so the
+	loop wakes up and sends it.
+	'''
+
+	def __init__(self, server):
+		self.server = server
+		read_fd, self.write_fd = os.pipe()
+		asyncore.file_dispatcher.__init__(self, read_fd, server.map)
+		os.close(read_fd)
+
+
+	# wake the loop up, from any thread
+	def wake(self):
+		try:
+			os.write(self.write_fd, 'x')
+		except OSError:
+			pass
+
+
+	def handle_read(self):
+		self.recv(4096)
+		self.server._sendResults()
+
+
+	def writable(self):
+		return False
+
+
+	def handle_close(self):
+		self.close()
+		os.close(self.write_fd)
+
+
+class _Connection(asynchat.async_chat):
+	'''
+	One client: reads requests one JSON object per line and queues one JSON response line per request, carrying
+	the request's id. Responses to optimal come when the search is done, possibly after responses to later
+	requests. The connection stops reading while it has MAX_PENDING searches running, the server MAX_QUEUED,
+	or MAX_OUTPUT bytes of responses are not sent yet, so clients sending faster than the games are played wait
+	in their socket buffers.
+	'''
+
+	def __init__(self, server, sock):
+		asynchat.async_chat.__init__(self, sock, server.map)
+		self.server = server
+		self.set_terminator('\n')
+		self.buffer = []
+		self.buffered = 0
+		self.pending = 0
+
+
+	def collect_incoming_data(self, data):
+		self.buffered += len(data)
+		if self.buffered > MAX_LINE:
+			if self.buffer:
+				self.buffer = []
+				self.respond(None, 'request', time.time(), error='request line too long')
+				self.close_when_done()
+			return
+		self.buffer.append(data)
+
+
+	def found_terminator(self):
+		line = ''.join(self.buffer)
+		self.buffer = []
+		self.buffered = 0
+		if line.strip():
+			self.server._handleRequest(self, line, time.time())
+
+
+	def readable(self):
+		if self.pending >= MAX_PENDING or self.server.pending >= MAX_QUEUED:
+			return False
+		return sum(len(p) for p in self.producer_fifo if isinstance(p, str)) < MAX_OUTPUT
+
+
+	# queue response to request id of cmd received at start
+	def respond(self, request_id, cmd, start, result=None, error=None):
+		response = {'id': request_id}
+		if error is None:
+			response['ok'] = True
+			response['result'] = result
+		else:
+			response['ok'] = False
+			response['error'] = error
+		self.push(json.dumps(response) + '\n')
+		self.server.metrics.record(cmd, time.time() - start, error is None)
+
+
+	def handle_close(self):
+		self.server.connections.discard(self)
+		self.close()
+
+
+class GameServer(asyncore.dispatcher):
+	'''
+	Hosts many games under one set of rules, played over a line-delimited JSON protocol on a TCP or Unix socket.
+
+	Each request is a JSON object on one line with a cmd and an optional id, echoed back in its response
+	({'id', 'ok', 'result'} or {'id', 'ok': false, 'error'}). Commands:
+	  new       {players, seed}                start a game, result is its game id
+	  state     {game}                         board, player to move, scores, rack of the player to move
+	  place     {game, word, tile, direction}  result is the word score
+	  exchange  {game, tiles}
+	  pass      {game}
+	  optimal   {game}                         optimalMap of the player to move
+	  close     {game}
+	  stats                                    latency metrics per command
+	Everything but optimal runs in the event loop. optimal sends a snapshot of the game to a process pool, and
+	pool threads hand results back through a pipe the loop watches, so searches never block other clients.
+	'''
+
+	def __init__(self, rules, address, processes=None):
+		self.map = {}
+		asyncore.dispatcher.__init__(self, map=self.map)
+		self.rules = rules
+		self.games = {}
+		self.next_game = 1
+		self.connections = set()
+		self.metrics = Metrics()
+		self.pending = 0
+		self.results = collections.deque()
+		self.running = False
+		self.pool = multiprocessing.Pool(processes, initWorker, (rules,))
+		self._wakeup = _Wakeup(self)
+		if isinstance(address, tuple):
+			self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+			self.set_reuse_addr()
+		else:
+			if os.path.exists(address): os.remove(address)
+			self.create_socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		self.bind(address)
+		self.listen(64)
+		self.address = self.socket.getsockname()
+
+
+	# run the event loop until stop is called
+	def serveForever(self):
+		self.running = True
+		while self.running:
+			asyncore.loop(POLL_TIMEOUT, map=self.map, count=1)
+		self._shutdown()
+
+
+	# make serveForever return, from any thread
+	def stop(self):
+		self.running = False
+		self._wakeup.wake()
+
+
+	def handle_accept(self):
+		pair = self.accept()
+		if pair is not None:
+			self.connections.add(_Connection(self, pair[0]))
+
+
+	# parse and run one request line of connection
+	def _handleRequest(self, connection, line, start):
+		try:
+			request = json.loads(line)
+			if not isinstance(request, dict):
+				raise ValueError('request is not an object')
+		except ValueError as e:
+			connection.respond(None, 'request', start, error='invalid request: ' + str(e))
+			return
+		request_id = request.get('id')
+		cmd = request.get('cmd')
+		# a command of any JSON type may come in; only strings name one
+		handler = self._commands.get(cmd) if isinstance(cmd, basestring) else None
+		if handler is None:
+			connection.respond(request_id, 'request', start, error='unknown command: ' + str(cmd))
+			return
+		try:
+			result = handler(self, connection, request, start)
+		except (KeyError, ValueError, TypeError) as e:
+			connection.respond(request_id, cmd, start, error=e.__class__.__name__ + ': ' + str(e))
+			return
+		# optimal responds once its search is done
+		if cmd != 'optimal':
+			connection.respond(request_id, cmd, start, result)
+
+
+	# return game of request, KeyError if there is none
+	def _getGame(self, request):
+		game = self.games.get(request['game'])
+		if game is None:
+			raise KeyError('no game ' + str(request['game']))
+		return game
+
+
+	def _new(self, connection, request, start):
+		players = int(request.get('players', 2))
+		if not 1 <= players <= MAX_PLAYERS:
+			raise ValueError('players must be 1 to ' + str(MAX_PLAYERS))
+		game_id = str(self.next_game)
+		self.next_game += 1
+		self.games[game_id] = Scrabble(players, rules=self.rules, seed=request.get('seed'))
+		return game_id
+
+
+	def _state(self, connection, request, start):
+		game = self._getGame(request)
+		board = game.board
+		state = {}
+		state['board'] = [[board.getTile(s), board.getLetter(s)] for s in range(0, board.squares) if board.letters[s]]
+		state['player'] = game.getPlayer()
+		state['scores'] = dict((p, game.player_data[p]['score']) for p in game.player_list)
+		state['rack'] = game.getLetters()
+		state['bag'] = len(game.bag)
+		state['over'] = game.isGameOver()
+		return state
+
+
+	def _place(self, connection, request, start):
+		score = self._getGame(request).placeWord(str(request['word']), str(request['tile']), str(request['direction']))
+		if score is False:
+			raise ValueError('word could not be placed')
+		return score
+
+
+	def _exchange(self, connection, request, start):
+		if not self._getGame(request).exchangeTiles([str(l) for l in request['tiles']]):
+			raise ValueError('invalid exchange')
+		return True
+
+
+	def _pass(self, connection, request, start):
+		self._getGame(request).passTurn()
+		return True
+
+
+	def _optimal(self, connection, request, start):
+		data = snapshot.dumps(self._getGame(request))
+		request_id = request.get('id')
+		connection.pending += 1
+		self.pending += 1
+		# the callback runs in a pool thread: queue the result and wake the loop up to send it
+		def done(result):
+			optimalMap, error = result
+			self.results.append((connection, request_id, start, optimalMap, error))
+			self._wakeup.wake()
+		self.pool.apply_async(_searchOptimal, (data,), callback=done)
+
+
+	def _close(self, connection, request, start):
+		self._getGame(request)
+		del self.games[request['game']]
+		return True
+
+
+	def _stats(self, connection, request, start):
+		stats = {}
+		stats['games'] = len(self.games)
+		stats['connections'] = len(self.connections)
+		stats['pending'] = self.pending
+		stats['commands'] = self.metrics.getSummary()
+		return stats
+
+
+	_commands = {'new': _new, 'state': _state, 'place': _place, 'exchange': _exchange, 'pass': _pass, 'optimal': _optimal, 'close': _close, 'stats': _stats}
+
+
+	# send results of searches finished since the last wake up
+	def _sendResults(self):
+		while self.results:
+			connection, request_id, start, result, error = self.results.popleft()
+			connection.pending -= 1
+			self.pending -= 1
+			if connection.connected:
+				connection.respond(request_id, 'optimal', start, result, error)
+
+
+	# close every connection and the pool
+	def _shutdown(self):
+		for connection in list(self.connections):
+			connection.close()
+		self.pool.terminate()
+		self.pool.join()
+		self._wakeup.handle_close()
+		self.close()
+		if not isinstance(self.address, tuple) and os.path.exists(self.address):
+			os.remove(self.address)
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='serve scrabble games over line-delimited JSON')
+	parser.add_argument('--host', default='127.0.0.1', help='TCP address to listen on')
+	parser.add_argument('--port', type=int, default=7777, help='TCP port to listen on')
+	parser.add_argument('--unix', default=None, help='Unix socket path to listen on instead of TCP')
+	parser.add_argument('-p', '--processes', type=int, default=None, help='search processes (default: all cores)')
+	parser.add_argument('--config', default=CONFIG_FILE, help='config file')
+	parser.add_argument('--dictionary', default=DICTIONARY_FILE, help='dictionary file')
+	args = parser.parse_args()
+
+	rules = Rules.fromFile(args.config, args.dictionary)
+	server = GameServer(rules, args.unix or (args.host, args.port), args.processes)
+	sys.stderr.write('serving on ' + str(server.address) + '\n')
+	try:
+		server.serveForever()
+	except KeyboardInterrupt:
+		server._shutdown()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import time
+import random
+from parallel import getWorkerGame
+from rack import Rack
+from bag import Bag
+
+# global variables
+CANDIDATES = 10
+DUPLICATE_PENALTY = 3.0
+
+# value of keeping each tile after a move, on top of its points
+LEAVE_VALUES = {
+	'a': 1.0, 'b': -2.0, 'c': 0.5, 'd': 0.5, 'e': 2.0, 'f': -2.0, 'g': -2.5, 'h': 1.0, 'i': -0.5,
+	'j': -1.5, 'k': -1.0, 'l': -0.5, 'm': 0.5, 'n': 0.5, 'o': -1.0, 'p': -0.5, 'q': -7.0, 'r': 1.0,
+	's': 7.5, 't': 0.5, 'u': -3.0, 'v': -5.5, 'w': -4.0, 'x': 3.5, 'y': -1.0, 'z': 3.0, 'blank': 25.0,
+}
+
+
+# return value of keeping letters, each extra copy of a tile costing DUPLICATE_PENALTY
+def getLeaveValue(letters):
+	value = 0.0
+	seen = set()
+	for l in letters:
+		value += LEAVE_VALUES.get(l, 0.0)
+		if l in seen: value -= DUPLICATE_PENALTY
+		seen.add(l)
+	return value
+
+
+# play move on game with rack_letters in hand and unseen tiles drawn by seed, return points of the best reply.
+# the move is taken back and the rack and bag of game restored before returning
+def _playout(game, rack_letters, unseen, move, seed):
+	points, word, tile, direction, letters_used = move
+	player = game.player
+	rack = game.player_data[player]['rack']
+	bag = game.bag
+	game.player_data[player]['rack'] = Rack(rack_letters)
+	# every unseen tile goes back in the bag, racks of the other players are drawn again from it
+	game.bag = Bag(unseen, seed)
+	try:
+		if game.applyMove(word, tile, direction) is False:
+			raise ValueError('move cannot be played: ' + str(move[1:4]))
+		# the next player replies from a rack drawn after the move
+		replier = game.player
+		reply_rack = game.player_data[replier]['rack']
+		game.player_data[replier]['rack'] = Rack()
+		state = game.bag.random.getstate()
+		drawn = []
+		try:
+			game._getTiles(replier, drawn)
+			return game._searchOptimalMove()['points']
+		finally:
+			game.bag.undraw(drawn, state)
+			game.player_data[replier]['rack'] = reply_rack
+			game.undoMove()
+	finally:
+		game.player_data[player]['rack'] = rack
+		game.bag = bag
+
+
+# play one move of a task in a worker process, on the board given by its letters and points
+def _simulateMove(task):
+	letters, points, rack_letters, unseen, move, seed = task
+	return _playout(getWorkerGame(letters, points), rack_letters, unseen, move, seed)
+
+
+class Simulator:
+	'''
+	Monte Carlo evaluation of the best moves of the current player of a game.
+
+	The candidates are the top moves by points (Scrabble.getTopMoves). Each iteration puts the unseen tiles
+	(the bag and the racks of the other players) in a bag seeded anew, plays a candidate with applyMove,
+	refills the rack from the bag and lets the next player reply with the optimal move of a rack drawn next,
+	then takes the move back with undoMove. Every candidate is played out on the same deals, so differences
+	between them come from the moves and not from the draws. The equity of a move is its points, minus the average points of the reply, plus
+	the value of the tiles left in the rack.
+
+	Iterations run in rounds of one playout per candidate, until the iteration or time budget is spent. A
+	MovePool of the same rules spreads each round across its processes; without one, playouts run here.
+	'''
+
+	def __init__(self, scrabble, candidates=CANDIDATES, seed=None, pool=None):
+		if pool is not None and scrabble.rules is not pool.rules:
+			raise ValueError('game is not played under the rules of this pool')
+		self.scrabble = scrabble
+		self.candidates = candidates
+		self.pool = pool
+		self.random = random.Random(seed)
+
+
+	# return [(equity, move, samples)] of the candidate moves, highest equity first, ties in points order.
+	# stops after iterations playouts per move or once time_limit seconds have passed, whichever comes first,
+	# always completing at least one round
+	def simulate(self, iterations=None, time_limit=None):
+		scrabble = self.scrabble
+		moves = scrabble.getTopMoves(self.candidates)
+		if not moves:
+			return []
+		deadline = None if time_limit is None else time.time() + time_limit
+		rack = scrabble.player_data[scrabble.player]['rack']
+		rack_letters = rack.letters()
+		unseen = self._getUnseen()
+		replies = [0] * len(moves)
+		samples = 0
+		while True:
+			seed = self.random.getrandbits(32)
+			for i, points in enumerate(self._playRound(rack_letters, unseen, moves, seed)):
+				replies[i] += points
+			samples += 1
+			if iterations is not None and samples >= iterations:
+				break
+			if deadline is not None and time.time() >= deadline:
+				break
+			# without a budget, one round
+			if iterations is None and deadline is None:
+				break
+		results = []
+		for i, move in enumerate(moves):
+			leave = rack.copy()
+			for l in move[4]: leave.remove(l)
+			equity = move[0] - float(replies[i]) / samples + getLeaveValue(leave.letters())
+			results.append((equity, -i, move))
+		results.sort(reverse=True)
+		return [(equity, move, samples) for equity, i, move in results]
+
+
+	# return points of the best reply to each of moves, for one deal of the unseen tiles
+	def _playRound(self, rack_letters, unseen, moves, seed):
+		scrabble = self.scrabble
+		if self.pool is None:
+			return [_playout(scrabble, rack_letters, unseen, move, seed) for move in moves]
+		letters = str(scrabble.board.letters)
+		points = scrabble.board.points.tostring()
+		tasks = [(letters, points, rack_letters, unseen, move, seed) for move in moves]
+		return self.pool.pool.map(_simulateMove, tasks)
+
+
+	# return tiles the current player cannot see: the bag and the racks of the other players
+	def _getUnseen(self):
+		scrabble = self.scrabble
+		unseen = scrabble.bag.letters()
+		for player in scrabble.player_list:
+			if player != scrabble.player:
+				unseen.extend(scrabble.player_data[player]['rack'].letters())
+		return sorted(unseen)
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import json
+import struct
+from scrabble import Scrabble
+from bag import Bag
+from rack import Rack, TILES, TILE_INDEX
+from lexicon import ALPHABET
+
+# snapshot: header, tiles on the board, bag, random state of the bag if saved, then one record per player
+MAGIC = 'SCRS'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sBIIBBBBHH')
+PLAYER = struct.Struct('<iB')
+RANDOM_STATE = struct.Struct('<B625IBd')
+HAS_RANDOM_STATE = 0x01
+
+# archive: snapshots one after the other, each prefixed with its length
+RECORD = struct.Struct('<I')
+
+
+# return binary snapshot of scrabble: board, reference to its rules, bag, racks, scores and turn.
+# with random_state, the random state of the bag is saved too, so draws after loads repeat exactly
+def dumps(scrabble, random_state=False):
+	board = scrabble.board
+	squares = [s for s in range(0, board.squares) if board.letters[s]]
+	bag = scrabble.bag.tiles
+	flags = HAS_RANDOM_STATE if random_state else 0
+	data = [HEADER.pack(MAGIC, FORMAT_VERSION, scrabble.rules.checksum, scrabble.lexicon.checksum, flags,
+		scrabble.player_size, scrabble.player_index, scrabble.scoreless_turns, len(squares), len(bag))]
+	data.append(struct.pack('<%dH' % len(squares), *squares))
+	data.append(''.join(chr(board.letters[s]) for s in squares))
+	data.append(''.join(chr(board.points[s]) for s in squares))
+	data.append(''.join(chr(TILE_INDEX[l]) for l in bag))
+	if random_state:
+		version, state, gauss = scrabble.bag.random.getstate()
+		data.append(RANDOM_STATE.pack(version, *(state + (gauss is not None, gauss or 0.0))))
+	for player in scrabble.player_list:
+		rack = scrabble.player_data[player]['rack'].letters()
+		data.append(PLAYER.pack(scrabble.player_data[player]['score'], len(rack)))
+		data.append(''.join(chr(TILE_INDEX[l]) for l in rack))
+	return ''.join(data)
+
+
+# return game saved by dumps, played under rules. a bag saved without its random state is seeded by seed.
+# ValueError if data is not a snapshot, is corrupt or was saved under other rules
+def loads(data, rules, seed=None):
+	if len(data) < HEADER.size:
+		raise ValueError('snapshot is truncated')
+	magic, version, rules_checksum, lexicon_checksum, flags, player_size, player_index, scoreless_turns, tile_count, bag_size = HEADER.unpack_from(data)
+	if magic != MAGIC or version != FORMAT_VERSION:
+		raise ValueError('not a snapshot of this format version')
+	if rules_checksum != rules.checksum or lexicon_checksum != rules.lexicon.checksum:
+		raise ValueError('snapshot was saved under other rules')
+	try:
+		offset = HEADER.size
+		squares = struct.unpack_from('<%dH' % tile_count, data, offset)
+		offset += 2 * tile_count
+		letters = data[offset:offset + tile_count]
+		offset += tile_count
+		points = data[offset:offset + tile_count]
+		offset += tile_count
+		bag = [TILES[ord(i)] for i in data[offset:offset + bag_size]]
+		offset += bag_size
+		state = None
+		if flags & HAS_RANDOM_STATE:
+			values = RANDOM_STATE.unpack_from(data, offset)
+			state = (values[0], values[1:626], values[627] if values[626] else None)
+			offset += RANDOM_STATE.size
+		players = []
+		for num in range(0, player_size):
+			score, rack_size = PLAYER.unpack_from(data, offset)
+			offset += PLAYER.size
+			players.append((score, [TILES[ord(i)] for i in data[offset:offset + rack_size]]))
+			offset += rack_size
+		if offset != len(data) or len(letters) != tile_count or len(points) != tile_count:
+			raise ValueError('snapshot is truncated')
+		tiles = [(squares[i], letters[i], ord(points[i])) for i in range(0, tile_count)]
+		_checkState(rules, tiles, player_size, player_index)
+		return _setState(Scrabble(player_size, rules=rules), tiles, bag, seed, state, players, player_index, scoreless_turns)
+	except (struct.error, IndexError):
+		raise ValueError('snapshot is truncated')
+
+
+# return JSON snapshot of scrabble, as dumps without the random state: tiles as 'row-col' squares
+def dumpsJSON(scrabble):
+	board = scrabble.board
+	snapshot = {}
+	snapshot['version'] = FORMAT_VERSION
+	snapshot['rules'] = scrabble.rules.checksum
+	snapshot['lexicon'] = scrabble.lexicon.checksum
+	snapshot['board'] = [[board.getTile(s), board.getLetter(s), board.points[s]] for s in range(0, board.squares) if board.letters[s]]
+	snapshot['bag'] = scrabble.bag.letters()
+	snapshot['players'] = [{'score': scrabble.player_data[p]['score'], 'rack': scrabble.player_data[p]['rack'].letters()} for p in scrabble.player_list]
+	snapshot['player'] = scrabble.player_index
+	snapshot['scoreless_turns'] = scrabble.scoreless_turns
+	return json.dumps(snapshot, sort_keys=True)
+
+
+# return game saved by dumpsJSON, played under rules, its bag seeded by seed
+def loadsJSON(text, rules, seed=None):
+	snapshot = json.loads(text)
+	if snapshot.get('version') != FORMAT_VERSION:
+		raise ValueError('not a snapshot of this format version')
+	if snapshot['rules'] != rules.checksum or snapshot['lexicon'] != rules.lexicon.checksum:
+		raise ValueError('snapshot was saved under other rules')
+	scrabble = Scrabble(len(snapshot['players']), rules=rules)
+	tiles = [(scrabble.board.getIndex(tile), str(letter), points) for tile, letter, points in snapshot['board']]
+	players = [(p['score'], [str(l) for l in p['rack']]) for p in snapshot['players']]
+	bag = [str(l) for l in snapshot['bag']]
+	_checkState(rules, tiles, len(players), snapshot['player'])
+	return _setState(scrabble, tiles, bag, seed, None, players, snapshot['player'], snapshot['scoreless_turns'])
+
+
+# append binary snapshot of scrabble to archive stream
+def dump(scrabble, stream, random_state=False):
+	data = dumps(scrabble, random_state)
+	stream.write(RECORD.pack(len(data)))
+	stream.write(data)
+
+
+# yield every snapshot of archive stream as bytes, reading one at a time
+def iterRecords(stream):
+	while True:
+		prefix = stream.read(RECORD.size)
+		if not prefix:
+			return
+		if len(prefix) < RECORD.size:
+			raise ValueError('archive is truncated')
+		size, = RECORD.unpack(prefix)
+		data = stream.read(size)
+		if len(data) < size:
+			raise ValueError('archive is truncated')
+		yield data
+
+
+# yield every game of archive stream, played under rules
+def iterLoad(stream, rules, seed=None):
+	for data in iterRecords(stream):
+		yield loads(data, rules, seed)
+
+
+# check tiles (square, letter, points) fit the board of rules, one per square, and player_index is one of
+# player_size players; ValueError if not
+def _checkState(rules, tiles, player_size, player_index):
+	if player_size < 1:
+		raise ValueError('snapshot has no players')
+	if not 0 <= player_index < player_size:
+		raise ValueError('player to move is not in the game: ' + str(player_index))
+	squares = set()
+	for square, letter, points in tiles:
+		if square is None or not 0 <= square < rules.board_size * rules.board_size or square in squares:
+			raise ValueError('tile off the board or on a square twice: ' + str(square))
+		if len(letter) != 1 or letter not in ALPHABET:
+			raise ValueError('invalid letter on board: ' + repr(letter))
+		squares.add(square)
+
+
+# set state of a newly created scrabble: tiles as (square, letter, points), bag letters with its seed or
+# random state, (score, rack letters) of each player, and turn
+def _setState(scrabble, tiles, bag, seed, state, players, player_index, scoreless_turns):
+	board = scrabble.board
+	for square, letter, points in tiles:
+		board.place(square, letter, points)
+	scrabble.cross_checks.update([square for square, letter, points in tiles])
+	scrabble.bag = Bag(bag, seed)
+	if state is not None:
+		scrabble.bag.random.setstate(state)
+	for player, (score, rack) in zip(scrabble.player_list, players):
+		scrabble.player_data[player]['score'] = score
+		scrabble.player_data[player]['rack'] = Rack(rack)
+	scrabble.player_index = player_index
+	scrabble.player = scrabble.player_list[player_index]
+	scrabble.scoreless_turns = scoreless_turns
+	return scrabble
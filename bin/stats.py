@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import time
+import cProfile
+
+
+class SearchStats:
+	'''
+	Counters and phase times of one search, filled in when passed to Scrabble.getOptimalMove(stats=...).
+
+	counters counts the work done (anchors searched, candidates generated, side word lookups, placements
+	scored, cache hits), rejected the candidates dropped per reason (bound, side_word,
+	rack, boundary, letters) and phases the seconds spent generating placements, optimizing their letters
+	and scoring them, plus the total. With profile, the search runs under cProfile and profile holds the
+	cProfile.Profile afterwards (for pstats). trace, if given, is called as trace(event, name, n) on every count
+	('count'), rejection ('reject') and phase time ('time'). Searches without stats only pay a None check
+	per anchor, per candidate and per node with side words.
+	'''
+
+	def __init__(self, profile=False, trace=None):
+		self.counters = {}
+		self.rejected = {}
+		self.phases = {}
+		self.profile = cProfile.Profile() if profile else None
+		self.trace = trace
+
+
+	# add n to counter name
+	def count(self, name, n=1):
+		self.counters[name] = self.counters.get(name, 0) + n
+		if self.trace is not None: self.trace('count', name, n)
+
+
+	# add n candidates rejected for reason
+	def reject(self, reason, n=1):
+		self.rejected[reason] = self.rejected.get(reason, 0) + n
+		if self.trace is not None: self.trace('reject', reason, n)
+
+
+	# add seconds to phase
+	def addTime(self, phase, seconds):
+		self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+		if self.trace is not None: self.trace('time', phase, seconds)
+
+
+	# yield items of iterable, adding the time spent producing them to phase
+	def timeIter(self, phase, iterable):
+		iterator = iter(iterable)
+		while True:
+			start = time.time()
+			try:
+				item = next(iterator)
+			except StopIteration:
+				self.addTime(phase, time.time() - start)
+				return
+			self.addTime(phase, time.time() - start)
+			yield item
+
+
+	# return fn(*args), timed as the total phase and run under the profiler if enabled
+	def run(self, fn, *args):
+		start = time.time()
+		try:
+			if self.profile is not None:
+				return self.profile.runcall(fn, *args)
+			return fn(*args)
+		finally:
+			self.addTime('total', time.time() - start)
+
+
+	# add counts and times of other stats
+	def merge(self, other):
+		for name, n in other.counters.items(): self.count(name, n)
+		for reason, n in other.rejected.items(): self.reject(reason, n)
+		for phase, seconds in other.phases.items(): self.addTime(phase, seconds)
+
+
+	# return counters, rejections and phase times as one dict
+	def asDict(self):
+		return {'counters': dict(self.counters), 'rejected': dict(self.rejected), 'phases': dict(self.phases)}
+
+
+	def __str__(self):
+		lines = []
+		for title, values in (('counters', self.counters), ('rejected', self.rejected)):
+			for name in sorted(values):
+				lines.append(title + '.' + name + ': ' + str(values[name]))
+		for phase in sorted(self.phases):
+			lines.append('phases.' + phase + ': ' + ('%.6f' % self.phases[phase]) + 's')
+		return '\n'.join(lines)
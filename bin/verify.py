@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright © 2011-2012. All Rights Reserved.
+Author: Brian Chan
+Contact: bchanx@gmail.com
+'''
+
+#!/usr/bin/env python
+
+import sys
+import random
+import argparse
+from scrabble import Scrabble, CONFIG_FILE, DICTIONARY_FILE
+from movegen import MoveGenerator
+from board import ACROSS, DOWN
+from rules import Rules
+from rack import Rack, TILES
+from move import Move
+
+# global variables
+BOARD_SIZE = 7
+PLAYS = 4
+
+
+# return words of lexicon by length, for words of at most size letters
+def getWordsByLength(lexicon, size):
+	words = {}
+	for word in lexicon:
+		if len(word) <= size:
+			words.setdefault(len(word), []).append(word)
+	return words
+
+
+# return word through square in direction on board, with letter on square
+def _getCrossWord(board, square, letter, direction):
+	word = letter
+	pos = board.getPosition(square, -1, direction)
+	while pos is not None and board.letters[pos]:
+		word = chr(board.letters[pos]) + word
+		pos = board.getPosition(pos, -1, direction)
+	pos = board.getPosition(square, 1, direction)
+	while pos is not None and board.letters[pos]:
+		word += chr(board.letters[pos])
+		pos = board.getPosition(pos, 1, direction)
+	return word
+
+
+# return whether square has a tile next to it in direction
+def _hasCrossTiles(board, square, direction):
+	for step in (-1, 1):
+		pos = board.getPosition(square, step, direction)
+		if pos is not None and board.letters[pos]:
+			return True
+	return False
+
+
+# yield every legal placement of rack on the board of scrabble as a move, once each, by brute force: every
+# word of the lexicon is tried on every stretch of squares, checking all words formed against the board
+# itself. A single tile forming an across word is an across move. words is getWordsByLength of the lexicon.
+def iterLegalMoves(scrabble, rack, words=None):
+	board = scrabble.board
+	lexicon = scrabble.lexicon
+	if words is None:
+		words = getWordsByLength(lexicon, board.size)
+	for direction in (ACROSS, DOWN):
+		cross = DOWN if direction == ACROSS else ACROSS
+		for start in range(0, board.squares):
+			before = board.getPosition(start, -1, direction)
+			if before is not None and board.letters[before]:
+				continue
+			for length in range(2, board.size + 1):
+				end = board.getPosition(start, length - 1, direction)
+				if end is None:
+					break
+				after = board.getPosition(end, 1, direction)
+				if after is not None and board.letters[after]:
+					continue
+				squares = [board.getPosition(start, i, direction) for i in range(0, length)]
+				empty = [i for i in range(0, length) if not board.letters[squares[i]]]
+				if not empty or len(empty) > rack.size:
+					continue
+				# a placement builds on the tiles in play, or covers the center of an empty board
+				if board.tile_count:
+					if len(empty) == length and not any(_hasCrossTiles(board, squares[i], cross) for i in empty):
+						continue
+				elif board.center not in squares:
+					continue
+				for word in words.get(length, ()):
+					if any(board.letters[squares[i]] and chr(board.letters[squares[i]]) != word[i] for i in range(0, length)):
+						continue
+					letters_used = rack.lettersUsed([word[i] for i in empty])
+					if not letters_used:
+						continue
+					cross_words = [_getCrossWord(board, squares[i], word[i], cross) for i in empty]
+					if any(len(w) > 1 and w not in lexicon for w in cross_words):
+						continue
+					if direction == DOWN and len(empty) == 1 and len(cross_words[0]) > 1:
+						continue
+					yield Move(word, start, direction, letters_used)
+
+
+# return (missing, extra, duplicates): legal moves of rack the move generator does not find, moves it finds
+# that are not legal, and moves it finds more than once. The board must hold tiles.
+def verifyPosition(scrabble, rack, words=None):
+	found = set()
+	duplicates = []
+	for move in scrabble._getPlacements(rack, MoveGenerator(scrabble)):
+		if move in found: duplicates.append(move)
+		found.add(move)
+	expected = set(iterLegalMoves(scrabble, rack, words))
+	return list(expected - found), list(found - expected), duplicates
+
+
+# return rules of rules on a board of size squares a side without premium squares, centered
+def getSmallRules(rules, size=BOARD_SIZE):
+	letters = dict((l, (rules.letters_count[l], rules.letters_points[l])) for l in TILES)
+	center = str(size // 2) + '-' + str(size // 2)
+	return Rules(rules.lexicon, size, rules.rack_size, center, {}, letters)
+
+
+# return a random rack of rules drawn from its letter distribution, holding a blank one time in three
+def getRandomRack(rules, rng):
+	tiles = []
+	for l in TILES:
+		if l != 'blank': tiles.extend([l] * rules.letters_count[l])
+	letters = rng.sample(tiles, rules.rack_size)
+	if rng.random() < 1.0 / 3:
+		letters[0] = 'blank'
+	return Rack(letters)
+
+
+# place move on the board of scrabble, blanks standing for the letters missing from its letters used
+def _placeMove(scrabble, move):
+	board = scrabble.board
+	letters_used = list(move.letters_used)
+	placed = []
+	for i, letter in enumerate(move.word):
+		square = board.getPosition(move.tile, i, move.direction)
+		if board.letters[square]:
+			continue
+		if letter in letters_used:
+			letters_used.remove(letter)
+			board.place(square, letter, scrabble.letters_points[letter])
+		else:
+			board.place(square, letter, 0)
+		placed.append(square)
+	scrabble.cross_checks.update(placed)
+
+
+# return a game under rules after up to plays random legal moves, each from a random rack
+def getRandomPosition(rules, rng, plays=PLAYS, words=None):
+	scrabble = Scrabble(1, rules=rules, seed=rng.getrandbits(32))
+	if words is None:
+		words = getWordsByLength(rules.lexicon, rules.board_size)
+	for play in range(0, plays):
+		moves = list(iterLegalMoves(scrabble, getRandomRack(rules, rng), words))
+		if moves:
+			_placeMove(scrabble, rng.choice(moves))
+	return scrabble
+
+
+# yield (position, rack, missing, extra, duplicates) of boards random positions under rules, as verifyPosition
+def verifyRandom(rules, boards, seed=None, plays=PLAYS):
+	rng = random.Random(seed)
+	words = getWordsByLength(rules.lexicon, rules.board_size)
+	for i in range(0, boards):
+		scrabble = getRandomPosition(rules, rng, plays, words)
+		if not scrabble.board.tile_count:
+			continue
+		rack = getRandomRack(rules, rng)
+		missing, extra, duplicates = verifyPosition(scrabble, rack, words)
+		yield scrabble, rack, missing, extra, duplicates
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='check the move generator against a brute force search of random small boards')
+	parser.add_argument('-n', '--boards', type=int, default=100, help='random positions to check (default: 100)')
+	parser.add_argument('-s', '--size', type=int, default=BOARD_SIZE, help='board size (default: ' + str(BOARD_SIZE) + ')')
+	parser.add_argument('-p', '--plays', type=int, default=PLAYS, help='random moves played to set up each position (default: ' + str(PLAYS) + ')')
+	parser.add_argument('--seed', type=int, default=None, help='random seed')
+	parser.add_argument('--config', default=CONFIG_FILE, help='config file')
+	parser.add_argument('--dictionary', default=DICTIONARY_FILE, help='dictionary file')
+	args = parser.parse_args()
+
+	rules = getSmallRules(Rules.fromFile(args.config, args.dictionary), args.size)
+	checked = failed = 0
+	for scrabble, rack, missing, extra, duplicates in verifyRandom(rules, args.boards, args.seed, args.plays):
+		checked += 1
+		if missing or extra or duplicates:
+			failed += 1
+			print scrabble.getBoard()
+			print 'rack: ' + ' '.join(rack.letters())
+			for name, moves in (('missing', missing), ('extra', extra), ('duplicate', duplicates)):
+				for move in moves:
+					print name + ': ' + repr(move)
+	sys.stderr.write(str(checked) + ' positions checked, ' + str(failed) + ' failed\n')
+	if failed:
+		sys.exit(1)
@@ -0,0 +1,82 @@
+import sys
+import random
+import json
+import StringIO
+sys.path.append('../bin')
+from scrabble import Scrabble
+from game_setup import playGreedy
+from analyze import Analyzer, analyzePosition, setupPosition, readPositions
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+rules = Scrabble(1, CONFIG_FILE, WORD_DICT).rules
+
+# positions set up without a config file find the moves a game set up from one finds
+def position_matchesGame():
+	scrabble = playGreedy(Scrabble(1, CONFIG_FILE, WORD_DICT, seed=2), 3)
+	words_in_play = []
+	board = scrabble.board
+	for s in range(0, board.squares):
+		if board.letters[s]:
+			letter = board.getLetter(s) if board.points[s] else '?' + board.getLetter(s)
+			words_in_play.append(letter + ';' + board.getTile(s) + ';across')
+	result = analyzePosition(rules, {'id': 7, 'words': '/'.join(words_in_play), 'rack': scrabble.getLetters()}, 3)
+	opt = scrabble.getOptimalMove()
+	assert result['id'] == 7
+	assert result['points'] == opt['points']
+	assert result['words'] == opt['words']
+	assert result['moves'] == scrabble.getTopMoves(3)
+
+# blanks are written '?' in racks given as strings
+def position_blankRack():
+	result = analyzePosition(rules, {'words': '', 'rack': 'sta?'})
+	assert result['points'] > 0
+	assert all('blank' in l for w, t, d, l in result['words'])
+
+# positions that cannot be set up come back as errors
+def position_invalid():
+	for position in ({'words': 'star;7-7', 'rack': 'a'}, {'words': 'star;7-7;sideways', 'rack': 'a'}, {'words': 'star;7-13;across', 'rack': 'a'},
+			{'words': 'star;15-0;across', 'rack': 'a'}, {'words': 's1ar;7-7;across', 'rack': 'a'}, {'words': 'star;7-7;across/trap;7-7;down', 'rack': 'a'},
+			{'words': 'zzzz;7-7;across', 'rack': 'a'}, {'words': 'star;x-y;across', 'rack': 'a'}, {'words': '', 'rack': 'a1'}, {'words': '', 'rack': 5},
+			{'words': '', 'rack': 'qq'}, {'words': 'quiz;7-7;across', 'rack': 'aqe'}):
+		assert 'invalid position' in analyzePosition(rules, position).get('error', ''), position
+
+# tiles with one copy (x, j, q, z, blanks) on the board never clash with the rack a new game draws, and the
+# bag holds every tile neither on the board nor on the rack
+def position_singleTiles():
+	position = {'words': 'box;7-7;across/?j?ar;3-3;across/quiz;11-2;across', 'rack': 'aeiou'}
+	expected = None
+	for seed in range(0, 40):
+		random.seed(seed)
+		result = analyzePosition(rules, position)
+		assert 'error' not in result, (seed, result)
+		if expected is None: expected = result
+		assert result == expected, seed
+		random.seed(seed)
+		scrabble = setupPosition(rules, position)
+		board = scrabble.board
+		tiles = [board.getLetter(s) if board.points[s] else 'blank' for s in range(0, board.squares) if board.letters[s]]
+		tiles += scrabble.player_data[scrabble.player]['rack'].letters() + scrabble.bag.letters()
+		assert sorted(tiles) == sorted(l for l, count in rules.letters_count.items() for i in range(0, count)), seed
+
+# results come back in input order, bad lines as errors, in JSON lines and CSV
+def analyzer_ordered():
+	lines = ['{"id": %d, "words": "star;7-7;across", "rack": "%s"}' % (i, r) for i, r in enumerate(['arts', 'tsar', 'ear', 'qua', 'stare'])]
+	lines.insert(2, 'not json')
+	analyzer = Analyzer(rules, 2)
+	results = list(analyzer.iterResults(readPositions(StringIO.StringIO('\n'.join(lines) + '\n'), 'jsonl')))
+	assert [r['line'] for r in results] == range(1, 7)
+	assert 'error' in results[2]
+	assert [r.get('id') for r in results] == [0, 1, None, 2, 3, 4]
+	assert analyzer.count == 6 and analyzer.errors == 1
+	serial = list(Analyzer(rules, 1).iterResults(readPositions(StringIO.StringIO('\n'.join(lines) + '\n'), 'jsonl')))
+	assert json.dumps(serial) == json.dumps(results)
+	rows = StringIO.StringIO('id,words,rack\n0,star;7-7;across,arts\n')
+	assert list(Analyzer(rules, 1).iterResults(readPositions(rows, 'csv')))[0]['words'] == results[0]['words']
+
+if __name__ == '__main__':
+	position_matchesGame()
+	position_blankRack()
+	position_invalid()
+	position_singleTiles()
+	analyzer_ordered()
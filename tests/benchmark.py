@@ -0,0 +1,165 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+sys.path.append('../bin')
+from scrabble import Scrabble
+from game_setup import playBest
+from lexicon import Lexicon, COMPILED_SUFFIX
+from movegen import MoveGenerator
+from rack import Rack
+import snapshot
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+LARGE_WORDS = 50000
+LARGE_SEED = 1
+POSITION_SEED = 5
+BLANK_RACK = ['blank', 'blank', 'a', 'e', 'r', 's', 't']
+
+# writes a large word list to word_list: words of a letter-pair Markov chain trained on the basic word list
+def generateWordList(word_list, size=LARGE_WORDS, seed=LARGE_SEED):
+	words = open(WORD_DICT).read().split()
+	rng = random.Random(seed)
+	follow = {}
+	for word in words:
+		word = '^^' + word + '$'
+		for i in range(2, len(word)):
+			follow.setdefault(word[i-2:i], []).append(word[i])
+	out = set(words)
+	while len(out) < size:
+		word = '^^'
+		while len(word) < 16:
+			l = rng.choice(follow[word[-2:]])
+			if l == '$': break
+			word += l
+		if 2 <= len(word) - 2 <= 12: out.add(word[2:])
+	with open(word_list, 'w') as f:
+		f.write('\n'.join(sorted(out)) + '\n')
+
+# returns positions of word_dict as snapshots: empty board, mid-game, dense endgame, and mid-game holding two blanks
+def getPositions(word_dict):
+	positions = {}
+	scrabble = Scrabble(2, CONFIG_FILE, word_dict, seed=POSITION_SEED)
+	positions['empty'] = snapshot.dumps(scrabble)
+	turn = 0
+	while not scrabble.isGameOver() and len(scrabble.bag):
+		playBest(scrabble)
+		turn += 1
+		if turn == 8:
+			positions['mid'] = snapshot.dumps(scrabble)
+			scrabble.player_data[scrabble.player]['rack'], rack = Rack(BLANK_RACK), scrabble.player_data[scrabble.player]['rack']
+			positions['blanks'] = snapshot.dumps(scrabble)
+			scrabble.player_data[scrabble.player]['rack'] = rack
+	positions['end'] = snapshot.dumps(scrabble)
+	positions.setdefault('mid', positions['end'])
+	positions.setdefault('blanks', positions['end'])
+	return positions
+
+# returns seconds per call of fn over repeat runs of number calls each: fastest and median run
+def measure(fn, repeat, number=1):
+	runs = []
+	for i in range(0, repeat):
+		start = time.time()
+		for j in range(0, number):
+			fn()
+		runs.append((time.time() - start) / number)
+	runs.sort()
+	return {'seconds': runs[0], 'median': runs[len(runs) // 2], 'calls': repeat * number}
+
+# returns placements of the current player ready to score: (letter_placements, word, tile, direction)
+def getScoringCalls(scrabble):
+	rack = scrabble.player_data[scrabble.player]['rack']
+	calls = []
+	for w, t, d, l in scrabble._getPlacements(rack, MoveGenerator(scrabble)):
+		letter_placements = scrabble._optimizeLetters(rack, w, t, d, l)
+		if letter_placements:
+			calls.append((letter_placements, w, t, d))
+	return calls
+
+# benchmarks of one word list: loading the dictionary, Scrabble.__init__, and per position getOptimalMove,
+# _checkWordScore and placeWord
+def benchmarkLexicon(name, word_dict, repeat):
+	results = {}
+	compiled = word_dict + COMPILED_SUFFIX
+	def compile():
+		if os.path.exists(compiled): os.remove(compiled)
+		Lexicon.fromFile(word_dict)
+	results[name + '/load_compile'] = measure(compile, repeat)
+	results[name + '/load_mapped'] = measure(lambda: Lexicon.fromCompiled(compiled), repeat, 10)
+	rules = Scrabble(1, CONFIG_FILE, word_dict).rules
+	results[name + '/init'] = measure(lambda: Scrabble(2, CONFIG_FILE, word_dict, seed=1), repeat, 10)
+	for position, data in sorted(getPositions(word_dict).items()):
+		key = name + '/' + position + '/'
+		scrabble = snapshot.loads(data, rules)
+		def search():
+			rules.move_cache.clear()
+			scrabble.getOptimalMove()
+		results[key + 'getOptimalMove'] = measure(search, repeat)
+		calls = getScoringCalls(scrabble)
+		if calls:
+			def score():
+				for call in calls: scrabble._checkWordScore(*call)
+			stats = measure(score, repeat)
+			results[key + '_checkWordScore'] = dict((k, v / len(calls)) for k, v in stats.items() if k != 'calls')
+			results[key + '_checkWordScore']['calls'] = stats['calls'] * len(calls)
+		words = scrabble.getOptimalMove()['words']
+		if words:
+			w, t, d, l = words[0]
+			games = [snapshot.loads(data, rules) for i in range(0, repeat)]
+			results[key + 'placeWord'] = measure(lambda: games.pop().placeWord(w, t, d), repeat)
+	return results
+
+# returns names of results slower than baseline by more than threshold (a fraction), printing the comparison
+def compareResults(results, baseline, threshold):
+	regressions = []
+	for name in sorted(results):
+		if name not in baseline:
+			continue
+		before = baseline[name]['seconds']
+		after = results[name]['seconds']
+		ratio = after / before if before else 1.0
+		flag = ''
+		if ratio > 1 + threshold:
+			regressions.append(name)
+			flag = '  REGRESSION'
+		sys.stderr.write('%-40s %12.6f %12.6f %7.2fx%s\n' % (name, before, after, ratio, flag))
+	return regressions
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='benchmark dictionary load, move generation and scoring')
+	parser.add_argument('-o', '--output', default=None, help='write results as JSON to this file (default: stdout)')
+	parser.add_argument('-b', '--baseline', default=None, help='JSON results to compare against')
+	parser.add_argument('-t', '--threshold', type=float, default=0.2, help='slowdown over baseline failing the run (default: 0.2, 20%%)')
+	parser.add_argument('-r', '--repeat', type=int, default=5, help='runs of each benchmark, the fastest counts')
+	parser.add_argument('--basic-only', action='store_true', help='skip the large generated word list')
+	args = parser.parse_args()
+
+	tmp_dir = tempfile.mkdtemp()
+	try:
+		results = {}
+		word_dict = os.path.join(tmp_dir, 'basic_english_word_list')
+		shutil.copy(WORD_DICT, word_dict)
+		results.update(benchmarkLexicon('basic', word_dict, args.repeat))
+		if not args.basic_only:
+			word_dict = os.path.join(tmp_dir, 'large_word_list')
+			generateWordList(word_dict)
+			results.update(benchmarkLexicon('large', word_dict, args.repeat))
+	finally:
+		shutil.rmtree(tmp_dir)
+	report = {'python': platform.python_version(), 'machine': platform.machine(), 'repeat': args.repeat, 'results': results}
+	text = json.dumps(report, indent=1, sort_keys=True)
+	if args.output:
+		with open(args.output, 'w') as f: f.write(text + '\n')
+	else:
+		print text
+	if args.baseline:
+		with open(args.baseline) as f: baseline = json.load(f)['results']
+		regressions = compareResults(results, baseline, args.threshold)
+		if regressions:
+			sys.stderr.write(str(len(regressions)) + ' benchmarks regressed by more than ' + str(int(args.threshold * 100)) + '%\n')
+			sys.exit(1)
@@ -0,0 +1,80 @@
+import sys
+import random
+sys.path.append('../bin')
+from scrabble import Scrabble
+from board import Board, ACROSS, DOWN
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# returns an empty board of the standard rules
+def getBoard():
+	return Board(Scrabble(1, CONFIG_FILE, WORD_DICT).rules)
+
+# returns tiles as (square, letter, points) of a random position, blanks worth no points
+def getRandomTiles(board, rng, count):
+	tiles = []
+	for square in rng.sample(range(0, board.squares), count):
+		tiles.append((square, rng.choice('abcdefghijklmnopqrstuvwxyz'), rng.choice([0, 1, 2, 4, 10])))
+	return tiles
+
+# squares convert to 'row-col' tiles and back, and steps stop at the edges of the board
+def board_indexMapping():
+	board = getBoard()
+	size = board.size
+	for square in range(0, board.squares):
+		tile = board.getTile(square)
+		assert tile == str(square // size) + '-' + str(square % size), tile
+		assert board.getIndex(tile) == square, tile
+	for tile in (str(size) + '-0', '0-' + str(size), str(size) + '-' + str(size)):
+		assert board.getIndex(tile) is None, tile
+	last = size - 1
+	assert board.getPosition(board.getIndex('7-7'), 1, ACROSS) == board.getIndex('7-8')
+	assert board.getPosition(board.getIndex('7-7'), -2, DOWN) == board.getIndex('5-7')
+	assert board.getPosition(board.getIndex('3-' + str(last)), 1, ACROSS) is None
+	assert board.getPosition(board.getIndex('3-0'), -1, ACROSS) is None
+	assert board.getPosition(board.getIndex(str(last) + '-3'), 1, DOWN) is None
+	assert board.getPosition(board.getIndex('0-3'), -1, DOWN) is None
+	assert board.getLine(2, ACROSS) == [board.getIndex('2-' + str(col)) for col in range(0, size)]
+	assert board.getLine(2, DOWN) == [board.getIndex(str(row) + '-2') for row in range(0, size)]
+
+# tiles placed and taken back off leave the board as it was, hash included
+def board_hashRestored():
+	board = getBoard()
+	rng = random.Random(3)
+	for trial in range(0, 20):
+		base = getRandomTiles(board, rng, 10)
+		for square, letter, points in base:
+			board.place(square, letter, points)
+		before = (str(board.letters), board.points.tostring(), board.tile_count, board.hash)
+		free = [s for s in range(0, board.squares) if not board.letters[s]]
+		for square in rng.sample(free, 7):
+			board.place(square, rng.choice('abcdefghijklmnopqrstuvwxyz'), rng.choice([0, 1, 3]))
+			assert board.hash != before[3]
+			board.unplace(square)
+			assert (str(board.letters), board.points.tostring(), board.tile_count, board.hash) == before
+		for square, letter, points in base:
+			board.unplace(square)
+		assert not board.hash and not board.tile_count
+
+# the same tiles placed in any order hash the same, and a blank hashes apart from the letter it stands for
+def board_hashOrder():
+	rng = random.Random(5)
+	for trial in range(0, 20):
+		tiles = getRandomTiles(getBoard(), rng, 12)
+		hashes = set()
+		for order in range(0, 4):
+			board = getBoard()
+			rng.shuffle(tiles)
+			for square, letter, points in tiles:
+				board.place(square, letter, points)
+			hashes.add(board.hash)
+		assert len(hashes) == 1, hashes
+		square, letter, points = tiles[0]
+		board.unplace(square)
+		board.place(square, letter, 0 if points else 1)
+		assert board.hash not in hashes
+
+if __name__ == '__main__':
+	board_indexMapping()
+	board_hashRestored()
+	board_hashOrder()
@@ -0,0 +1,56 @@
+import sys
+import random
+sys.path.append('../bin')
+from scrabble import Scrabble
+from crosscheck import CrossChecks
+from board import ACROSS, DOWN
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# returns cross-checks of the board of scrabble computed from scratch, every empty square at once
+def recompute(scrabble):
+	board = scrabble.board
+	cross_checks = CrossChecks(scrabble.lexicon, board)
+	for square in range(0, board.squares):
+		if board.letters[square]:
+			continue
+		for direction in (ACROSS, DOWN):
+			cross_checks._computeSquare(square, direction)
+			for step in (-1, 1):
+				neighbour = board.getPosition(square, step, direction)
+				if neighbour is not None and board.letters[neighbour]:
+					cross_checks.anchors[square] = 1
+	return cross_checks
+
+# asserts the cross-checks kept up to date by scrabble match a full recompute
+def checkCrossChecks(scrabble):
+	cross_checks = scrabble.cross_checks
+	expected = recompute(scrabble)
+	for direction in (ACROSS, DOWN):
+		assert cross_checks.allowed[direction] == expected.allowed[direction], direction
+		assert cross_checks.side_points[direction] == expected.side_points[direction], direction
+	assert cross_checks.anchors == expected.anchors
+
+# random moves played and taken back leave the cross-checks as a full recompute finds them after every step
+def crossChecks_matchRecompute():
+	for seed in range(0, 4):
+		rng = random.Random(seed)
+		scrabble = Scrabble(2, CONFIG_FILE, WORD_DICT, seed=seed)
+		for step in range(0, 24):
+			if scrabble.moves_applied and rng.random() < 0.3:
+				scrabble.undoMove()
+			else:
+				moves = list(scrabble.iterMoves())
+				if moves:
+					points, w, t, d, l = rng.choice(moves)
+					assert scrabble.applyMove(w, t, d) is not False
+				else:
+					scrabble.applyPass()
+			checkCrossChecks(scrabble)
+		while scrabble.moves_applied:
+			scrabble.undoMove()
+			checkCrossChecks(scrabble)
+		assert not scrabble.board.tile_count
+
+if __name__ == '__main__':
+	crossChecks_matchRecompute()
@@ -0,0 +1,112 @@
+import os
+import sys
+import stat
+import shutil
+import tempfile
+sys.path.append('../bin')
+import lexicon as lexicon_module
+from lexicon import Lexicon, COMPILED_SUFFIX
+WORD_LIST = '../config/basic_english_word_list'
+
+# words shorter than 2 letters or with unknown characters are dropped
+def build_filtersWords():
+	lexicon = Lexicon(['a', 'at', 'At', 'ate', 'at'])
+	assert len(lexicon) == 2, len(lexicon)
+	assert 'at' in lexicon
+	assert 'ate' in lexicon
+	assert 'a' not in lexicon
+	assert 'At' not in lexicon
+
+# prefixes are walkable but are not words on their own
+def follow_prefix():
+	lexicon = Lexicon(['start', 'stark', 'starts'])
+	assert 'star' not in lexicon
+	node, terminal = lexicon.follow('star')
+	assert not terminal
+	assert [l for l, child, terminal in lexicon.children(node)] == ['k', 't']
+	assert lexicon.follow('stop') is None
+
+# shared suffixes are merged into the same nodes
+def build_minimized():
+	lexicon = Lexicon(['tap', 'taps', 'top', 'tops'])
+	a, t1 = lexicon.follow('ta')
+	o, t2 = lexicon.follow('to')
+	assert a == o, (a, o)
+
+# iterating the lexicon gives back the full word list in order
+def iterate_wordList():
+	words = open(WORD_LIST).read().split()
+	expected = sorted(set(w for w in words if len(w) >= 2 and w.islower()))
+	lexicon = Lexicon.fromFile(WORD_LIST)
+	assert list(lexicon) == expected
+	for word in expected:
+		assert word in lexicon, word
+
+# anagram lookup covers every subset of the letters, with blanks standing for any letter
+def anagrams_blanks():
+	lexicon = Lexicon(['star', 'rats', 'tsar', 'art', 'stare', 'at', 'zoo'])
+	assert lexicon.findAnagrams(['s', 't', 'a', 'r']) == set(['star', 'rats', 'tsar', 'art', 'at'])
+	assert lexicon.findAnagrams(['t', 'a', 'r'], 1) == set(['star', 'rats', 'tsar', 'art', 'at'])
+	assert lexicon.findAnagrams(['o'], 2) == set(['at', 'zoo'])
+	assert lexicon.findAnagrams([]) == set()
+
+# word lists are compiled once, then mapped from the compiled file until the word list changes
+def compiled_rebuildStale():
+	tmp_dir = tempfile.mkdtemp()
+	try:
+		word_list = os.path.join(tmp_dir, 'words')
+		with open(word_list, 'w') as f: f.write('stop\nstarts\n')
+		first = Lexicon.fromFile(word_list)
+		assert os.path.exists(word_list + COMPILED_SUFFIX)
+		assert Lexicon.fromFile(word_list) is first
+		del first
+		mapped = Lexicon.fromFile(word_list)
+		assert mapped._mmap is not None
+		assert list(mapped) == ['starts', 'stop']
+		# same size, different words
+		with open(word_list, 'w') as f: f.write('stops\nstars\n')
+		rebuilt = Lexicon.fromFile(word_list)
+		assert rebuilt._mmap is None
+		assert list(rebuilt) == ['stars', 'stops'], list(rebuilt)
+		# compiled file can be loaded directly
+		direct = Lexicon.fromFile(word_list + COMPILED_SUFFIX)
+		assert 'stars' in direct and 'stop' not in direct
+	finally:
+		shutil.rmtree(tmp_dir)
+
+# decoded edges are kept for at most CHILDREN_CACHE_SIZE nodes, and iterating keeps none
+def children_cacheBounded():
+	lexicon = Lexicon(open(WORD_LIST).read().split())
+	words = list(lexicon)
+	assert not lexicon._children
+	size = lexicon_module.CHILDREN_CACHE_SIZE
+	lexicon_module.CHILDREN_CACHE_SIZE = 16
+	try:
+		for word in words:
+			assert word in lexicon, word
+			assert len(lexicon._children) <= 16
+	finally:
+		lexicon_module.CHILDREN_CACHE_SIZE = size
+
+# compiled files get the mode of files created under the umask, not the private mode of temporary files
+def compiled_mode():
+	tmp_dir = tempfile.mkdtemp()
+	umask = os.umask(022)
+	try:
+		compiled_file = os.path.join(tmp_dir, 'words' + COMPILED_SUFFIX)
+		Lexicon(['stop', 'starts']).save(compiled_file)
+		assert stat.S_IMODE(os.stat(compiled_file).st_mode) == 0644, oct(os.stat(compiled_file).st_mode)
+	finally:
+		os.umask(umask)
+		shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+	build_filtersWords()
+	follow_prefix()
+	build_minimized()
+	iterate_wordList()
+	anagrams_blanks()
+	compiled_rebuildStale()
+	children_cacheBounded()
+	compiled_mode()
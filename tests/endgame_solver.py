@@ -0,0 +1,79 @@
+import sys
+import time
+sys.path.append('../bin')
+from scrabble import Scrabble
+from game_setup import playGreedy
+from endgame import EndgameSolver
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# returns a two player game played greedily until the bag is empty
+def setupEndgame(seed):
+	scrabble = playGreedy(Scrabble(2, CONFIG_FILE, WORD_DICT, seed=seed))
+	assert not scrabble.isGameOver()
+	return scrabble
+
+# returns the final spread of the player to move with both players playing every move perfectly
+def getMinimaxSpread(scrabble, player, memo):
+	if scrabble.isGameOver():
+		scores = scrabble.getFinalScores()
+		return scores[player] - sum(scores[p] for p in scrabble.player_list if p != player)
+	key = (scrabble.board.hash, scrabble.player_data['player0']['rack'].signature, scrabble.player_data['player1']['rack'].signature, scrabble.player_index, scrabble.scoreless_turns, scrabble.player_data['player0']['score'] - scrabble.player_data['player1']['score'])
+	if key not in memo:
+		spreads = []
+		for move in list(scrabble.iterMoves()) + [None]:
+			if move is None: scrabble.applyPass()
+			else: scrabble.applyMove(move[1], move[2], move[3])
+			spreads.append(getMinimaxSpread(scrabble, player, memo))
+			scrabble.undoMove()
+		memo[key] = max(spreads) if scrabble.player == player else min(spreads)
+	return memo[key]
+
+# returns what the solver must leave as it was
+def getState(scrabble):
+	return (scrabble.board.hash, scrabble.player, scrabble.scoreless_turns, [(scrabble.player_data[p]['score'], scrabble.player_data[p]['rack'].letters()) for p in scrabble.player_list])
+
+# solved endgames find the minimax spread, and their line plays out to it
+def endgame_solved():
+	for seed in (6, 7):
+		scrabble = setupEndgame(seed)
+		state = getState(scrabble)
+		result = EndgameSolver(scrabble, time_limit=None).solve()
+		assert getState(scrabble) == state and not scrabble.moves_applied
+		assert result['exact'] and result['nodes'] > 0
+		assert result['spread'] == getMinimaxSpread(scrabble, scrabble.player, {}), seed
+		player = scrabble.player
+		for move in result['moves']:
+			if move is None: scrabble.applyPass()
+			else: assert scrabble.applyMove(move[1], move[2], move[3]) == move[0]
+		assert scrabble.isGameOver()
+		scores = scrabble.getFinalScores()
+		assert scores[player] - sum(scores[p] for p in scrabble.player_list if p != player) == result['spread']
+		for move in result['moves']: scrabble.undoMove()
+		assert getState(scrabble) == state
+
+# full racks stop deepening at the time limit, keeping the last complete iteration
+def endgame_timeLimit():
+	scrabble = setupEndgame(1)
+	state = getState(scrabble)
+	start = time.time()
+	result = EndgameSolver(scrabble, time_limit=1.0).solve()
+	assert time.time() - start < 3.0
+	assert not result['exact'] and result['depth'] >= 1
+	assert result['moves'] and result['moves'][0] is not None
+	assert getState(scrabble) == state and not scrabble.moves_applied
+	assert EndgameSolver(scrabble, time_limit=None).solve(max_depth=2)['depth'] == 2
+
+# only two player games with an empty bag are endgames
+def endgame_rejected():
+	for scrabble in (Scrabble(2, CONFIG_FILE, WORD_DICT, seed=1), Scrabble(3, CONFIG_FILE, WORD_DICT, seed=1)):
+		try:
+			EndgameSolver(scrabble)
+			assert False
+		except ValueError:
+			pass
+
+if __name__ == '__main__':
+	endgame_solved()
+	endgame_timeLimit()
+	endgame_rejected()
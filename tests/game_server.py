@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import socket
+import tempfile
+import threading
+sys.path.append('../bin')
+from scrabble import Scrabble
+from server import GameServer
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# returns a server running in a thread
+def startServer(address):
+	rules = Scrabble(1, CONFIG_FILE, WORD_DICT).rules
+	server = GameServer(rules, address, 2)
+	thread = threading.Thread(target=server.serveForever)
+	thread.daemon = True
+	thread.start()
+	return server, thread
+
+class Client:
+	def __init__(self, family, address):
+		self.sock = socket.socket(family, socket.SOCK_STREAM)
+		self.sock.connect(address)
+		self.file = self.sock.makefile('r')
+
+	# send requests, returns their responses by id
+	def send(self, *requests):
+		self.sock.sendall(''.join(json.dumps(r) + '\n' for r in requests))
+		responses = {}
+		for r in requests:
+			response = json.loads(self.file.readline())
+			responses[response['id']] = response
+		return responses
+
+	def close(self):
+		self.file.close()
+		self.sock.close()
+
+# a game is played over TCP, the optimal move coming back from the pool
+def server_playGame():
+	server, thread = startServer(('127.0.0.1', 0))
+	client = Client(socket.AF_INET, server.address)
+	try:
+		game = client.send({'id': 1, 'cmd': 'new', 'players': 2, 'seed': 3})[1]['result']
+		state = client.send({'id': 2, 'cmd': 'state', 'game': game})[2]['result']
+		assert state['board'] == [] and len(state['rack']) == 7
+		opt = client.send({'id': 3, 'cmd': 'optimal', 'game': game})[3]['result']
+		local = Scrabble(2, CONFIG_FILE, WORD_DICT, seed=3).getOptimalMove()
+		assert opt['points'] == local['points']
+		w, t, d, l = opt['words'][0]
+		responses = client.send({'id': 4, 'cmd': 'place', 'game': game, 'word': w, 'tile': t, 'direction': d}, {'id': 5, 'cmd': 'state', 'game': game})
+		assert responses[4]['result'] == opt['points']
+		assert responses[5]['result']['player'] == 'player1'
+		assert client.send({'id': 6, 'cmd': 'pass', 'game': game})[6]['ok']
+		stats = client.send({'id': 7, 'cmd': 'stats'})[7]['result']
+		assert stats['games'] == 1 and stats['pending'] == 0
+		assert stats['commands']['optimal']['count'] == 1
+	finally:
+		client.close()
+		server.stop()
+		thread.join()
+
+# errors come back as responses, over a Unix socket, and searches of many games run side by side
+def server_unixErrors():
+	path = os.path.join(tempfile.mkdtemp(), 'scrabble.sock')
+	server, thread = startServer(path)
+	client = Client(socket.AF_UNIX, path)
+	try:
+		responses = client.send({'id': 1, 'cmd': 'place', 'game': 'none'}, {'id': 2, 'cmd': 'dance'})
+		assert not responses[1]['ok'] and not responses[2]['ok']
+		responses = client.send({'id': 3, 'cmd': 'new', 'players': 0}, {'id': 4, 'cmd': 'new', 'players': -1}, {'id': 5, 'cmd': 'new', 'players': 10 ** 9})
+		assert not any(responses[i]['ok'] for i in (3, 4, 5))
+		client.sock.sendall('not json\n')
+		assert not json.loads(client.file.readline())['ok']
+		responses = client.send({'id': 6, 'cmd': ['new']}, {'id': 7, 'cmd': {'new': 1}}, {'id': 8, 'cmd': 'new'})
+		assert not responses[6]['ok'] and not responses[7]['ok'] and responses[8]['ok']
+		games = [client.send({'id': i, 'cmd': 'new', 'seed': i})[i]['result'] for i in range(0, 6)]
+		responses = client.send(*[{'id': i, 'cmd': 'optimal', 'game': g} for i, g in enumerate(games)])
+		assert all(responses[i]['ok'] for i in range(0, 6))
+	finally:
+		client.close()
+		server.stop()
+		thread.join()
+	assert not os.path.exists(path)
+
+if __name__ == '__main__':
+	server_playGame()
+	server_unixErrors()
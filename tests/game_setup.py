@@ -0,0 +1,25 @@
+import sys
+sys.path.append('../bin')
+
+# plays the first optimal word of the player to move, passing when there is none; returns the points scored.
+# with applied, the turn is played with applyMove / applyPass so it can be taken back
+def playBest(scrabble, applied=False):
+	words = scrabble.getOptimalMove()['words']
+	if not words:
+		if applied: scrabble.applyPass()
+		else: scrabble.passTurn()
+		return 0
+	w, t, d, l = words[0]
+	if applied:
+		return scrabble.applyMove(w, t, d)
+	return scrabble.placeWord(w, t, d)
+
+# returns scrabble after turns turns of playBest, or after turns played until the bag is empty when turns is None
+def playGreedy(scrabble, turns=None):
+	if turns is None:
+		while len(scrabble.bag):
+			playBest(scrabble)
+	else:
+		for turn in range(0, turns):
+			playBest(scrabble)
+	return scrabble
@@ -0,0 +1,105 @@
+import sys
+import struct
+import StringIO
+sys.path.append('../bin')
+from scrabble import Scrabble
+from game_setup import playGreedy
+from board import ACROSS, DOWN
+import snapshot
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# returns a two player game a few moves in
+def setupGame(seed):
+	return playGreedy(Scrabble(2, CONFIG_FILE, WORD_DICT, seed=seed), 5)
+
+# returns everything a snapshot saves, and the cross-checks rebuilt from it
+def getState(scrabble):
+	board = scrabble.board
+	cross_checks = scrabble.cross_checks
+	state = {}
+	state['board'] = (str(board.letters), board.points.tostring(), board.tile_count, board.hash)
+	state['cross_checks'] = (cross_checks.allowed[ACROSS], cross_checks.allowed[DOWN], cross_checks.side_points[ACROSS], cross_checks.side_points[DOWN], str(cross_checks.anchors))
+	state['players'] = [(p, scrabble.player_data[p]['score'], scrabble.player_data[p]['rack'].letters()) for p in scrabble.player_list]
+	state['bag'] = scrabble.bag.letters()
+	state['turn'] = (scrabble.player, scrabble.scoreless_turns)
+	return state
+
+# binary snapshots round-trip the game
+def binary_roundTrip():
+	scrabble = setupGame(2)
+	data = snapshot.dumps(scrabble)
+	loaded = snapshot.loads(data, scrabble.rules)
+	assert getState(loaded) == getState(scrabble)
+	assert snapshot.dumps(loaded) == data
+	assert loaded.getOptimalMove() == scrabble.getOptimalMove()
+
+# with the random state, draws after loading repeat the draws of the game saved
+def binary_randomState():
+	scrabble = setupGame(3)
+	loaded = snapshot.loads(snapshot.dumps(scrabble, random_state=True), scrabble.rules)
+	assert [loaded.bag.draw() for i in range(0, 10)] == [scrabble.bag.draw() for i in range(0, 10)]
+
+# JSON snapshots round-trip the game
+def json_roundTrip():
+	scrabble = setupGame(4)
+	text = snapshot.dumpsJSON(scrabble)
+	loaded = snapshot.loadsJSON(text, scrabble.rules)
+	assert getState(loaded) == getState(scrabble)
+	assert snapshot.dumpsJSON(loaded) == text
+
+# archives are read back one game at a time, in order
+def archive_stream():
+	games = [setupGame(seed) for seed in range(5, 9)]
+	stream = StringIO.StringIO()
+	for scrabble in games:
+		snapshot.dump(scrabble, stream)
+	stream.seek(0)
+	loaded = list(snapshot.iterLoad(stream, games[0].rules))
+	assert [getState(g) for g in loaded] == [getState(g) for g in games]
+	stream = StringIO.StringIO(stream.getvalue()[:-3])
+	try:
+		list(snapshot.iterRecords(stream))
+		assert False
+	except ValueError:
+		pass
+
+# snapshots are refused under other rules, or when corrupt
+def snapshot_refused():
+	scrabble = setupGame(9)
+	data = snapshot.dumps(scrabble)
+	other = Scrabble(1, './test_config/optimal_move.conf', './test_config/optimal_move')
+	for bad, rules in ((data, other.rules), (data[:-1], scrabble.rules), ('XXXX' + data[4:], scrabble.rules), (data[:5], scrabble.rules)):
+		try:
+			snapshot.loads(bad, rules)
+			assert False
+		except ValueError:
+			pass
+
+# corrupt fields of a snapshot come out as ValueError: players, the player to move, squares and letters
+def snapshot_corrupt():
+	scrabble = setupGame(9)
+	rules = scrabble.rules
+	data = snapshot.dumps(scrabble)
+	fields = list(snapshot.HEADER.unpack_from(data))
+	tiles = snapshot.HEADER.size
+	letters = tiles + 2 * fields[8]
+	players = len(data) - sum(snapshot.PLAYER.size + len(scrabble.player_data[p]['rack']) for p in scrabble.player_list)
+	header = lambda **changes: snapshot.HEADER.pack(*[changes.get(name, value) for name, value in zip(
+		('magic', 'version', 'rules', 'lexicon', 'flags', 'player_size', 'player_index', 'scoreless', 'tiles', 'bag'), fields)])
+	for bad in (header(player_size=0) + data[tiles:players], header(player_index=2) + data[tiles:], header(player_index=255) + data[tiles:],
+			data[:tiles] + struct.pack('<H', 65535) + data[tiles + 2:], data[:tiles] + data[tiles + 2:tiles + 4] + data[tiles + 2:],
+			data[:letters] + 'A' + data[letters + 1:], data[:letters] + '\xff' + data[letters + 1:]):
+		try:
+			snapshot.loads(bad, rules)
+			assert False, repr(bad[:32])
+		except ValueError:
+			pass
+
+if __name__ == '__main__':
+	binary_roundTrip()
+	binary_randomState()
+	json_roundTrip()
+	archive_stream()
+	snapshot_refused()
+	snapshot_corrupt()
@@ -0,0 +1,94 @@
+import sys
+sys.path.append('../bin')
+from scrabble import Scrabble
+from board import Board
+from rules import Rules
+from movecache import MoveCache
+CONFIG_FILE = './test_config/optimal_move.conf'
+WORD_DICT = './test_config/optimal_move'
+WORDS = ['no', 'on', 'not', 'ton', 'onto', 'snot']
+
+# setup dictionary, returns rules
+def setupRules(word_list):
+	with open(WORD_DICT, 'w') as word_dict:
+		for word in word_list:
+			word_dict.write(word+'\n')
+	return Rules.fromFile(CONFIG_FILE, WORD_DICT)
+
+# return game under rules, with letters in hand and word placed at tile
+def setupGame(rules, letters_in_hand, word, tile, direction):
+	scrabble = Scrabble(1, rules=rules)
+	rack = scrabble.player_data['player0']['rack']
+	for l in rack.letters(): rack.remove(l)
+	for l in letters_in_hand: rack.add(l)
+	tile = scrabble.board.getIndex(tile)
+	scrabble._addWordInPlay(scrabble._parseWord(word, tile, direction), word, tile, direction)
+	return scrabble
+
+# boards holding the same tiles hash the same, whatever order they were placed in
+def hash_orderFree():
+	rules = setupRules(WORDS)
+	a = Board(rules)
+	b = Board(rules)
+	a.place(0, 'n', 1)
+	a.place(1, 'o', 1)
+	b.place(1, 'o', 1)
+	b.place(0, 'n', 1)
+	assert a.hash == b.hash and a.hash != 0
+	c = Board(rules)
+	c.place(0, 'n', 1)
+	c.place(1, 'o', 0)
+	assert c.hash != a.hash
+
+# second game on the same position and rack is answered from the cache, as a copy
+def cache_hit():
+	rules = setupRules(WORDS)
+	rules.move_cache.clear()
+	first = setupGame(rules, 'ont', 'no', '7-7', 'across')
+	opt = first.getOptimalMove()
+	assert (rules.move_cache.hits, rules.move_cache.misses) == (0, 1)
+	opt['words'][0][3].append('x')
+	opt['words'].append(None)
+	second = setupGame(rules, 'tno', 'no', '7-7', 'across')
+	cached = second.getOptimalMove()
+	assert (rules.move_cache.hits, rules.move_cache.misses) == (1, 1)
+	assert cached == second._searchOptimalMove(), cached
+	# another rack misses
+	third = setupGame(rules, 'onn', 'no', '7-7', 'across')
+	assert third.getOptimalMove() == third._searchOptimalMove()
+	assert rules.move_cache.misses == 2
+
+# a new word list means new rules, and keys under another lexicon checksum
+def cache_lexiconChange():
+	rules = setupRules(WORDS)
+	rules.move_cache.clear()
+	setupGame(rules, 'ont', 'no', '7-7', 'across').getOptimalMove()
+	other = setupRules(WORDS + ['tonn'])
+	assert other.lexicon.checksum != rules.lexicon.checksum
+	scrabble = setupGame(other, 'ont', 'no', '7-7', 'across')
+	cache = MoveCache()
+	cache.put(setupGame(rules, 'ont', 'no', '7-7', 'across'), {'points': 1, 'words': []})
+	assert cache.get(scrabble) is None
+	assert scrabble.getOptimalMove() == scrabble._searchOptimalMove()
+
+# least recently used entries are evicted first
+def cache_evict():
+	rules = setupRules(WORDS)
+	cache = MoveCache(2)
+	games = [setupGame(rules, letters, 'no', '7-7', 'across') for letters in ('ont', 'onn', 'oot')]
+	for i, scrabble in enumerate(games[:2]):
+		cache.put(scrabble, {'points': i, 'words': []})
+	assert cache.get(games[0])['points'] == 0
+	cache.put(games[2], {'points': 2, 'words': []})
+	assert len(cache) == 2
+	assert cache.get(games[1]) is None
+	assert cache.get(games[0])['points'] == 0
+	cache.resize(0)
+	cache.put(games[1], {'points': 1, 'words': []})
+	assert len(cache) == 0
+
+if __name__ == '__main__':
+	hash_orderFree()
+	cache_hit()
+	cache_lexiconChange()
+	cache_evict()
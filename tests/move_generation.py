@@ -0,0 +1,40 @@
+import sys
+sys.path.append('../bin')
+from scrabble import Scrabble
+from game_setup import playGreedy
+from movegen import MoveGenerator
+from board import ACROSS, DOWN
+from rack import Rack
+import verify
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# the move generator finds every legal move of random small boards exactly once
+def generation_matchesOracle():
+	rules = verify.getSmallRules(Scrabble(1, CONFIG_FILE, WORD_DICT).rules)
+	checked = 0
+	for scrabble, rack, missing, extra, duplicates in verify.verifyRandom(rules, 12, 1):
+		assert not missing and not extra and not duplicates, (rack.letters(), missing, extra, duplicates)
+		checked += 1
+	assert checked >= 10
+
+# mid-game, placements only forming side words are found, and single tiles once
+def generation_midGame():
+	scrabble = playGreedy(Scrabble(1, CONFIG_FILE, WORD_DICT, seed=3), 3)
+	board = scrabble.board
+	for letters in (['a', 'e', 'r', 's', 't', 'n', 'o'], ['blank', 'a', 'e', 'r', 's', 't', 'd']):
+		rack = Rack(letters)
+		moves = list(scrabble._getPlacements(rack, MoveGenerator(scrabble)))
+		assert len(set(moves)) == len(moves)
+		assert set(moves) == set(verify.iterLegalMoves(scrabble, rack))
+		assert any(len(move.letters_used) == len(move.word) for move in moves)
+		for move in moves:
+			# a single tile with letters beside it is played across
+			if move.direction == DOWN and len(move.letters_used) == 1:
+				squares = [board.getPosition(move.tile, i, DOWN) for i in range(0, len(move.word))]
+				placed = [s for s in squares if not board.letters[s]]
+				assert not verify._hasCrossTiles(board, placed[0], ACROSS)
+
+if __name__ == '__main__':
+	generation_matchesOracle()
+	generation_midGame()
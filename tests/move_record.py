@@ -0,0 +1,47 @@
+import sys
+import pickle
+sys.path.append('../bin')
+from scrabble import Scrabble
+from movegen import MoveGenerator
+from move import Move
+from game_setup import playBest
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# moves are equal and hash alike whatever order their letters come in, and cannot be changed
+def move_hashable():
+	move = Move('star', 112, 0, ['t', 's', 'blank', 'a'])
+	same = Move('star', 112, 0, ('a', 'blank', 's', 't'))
+	assert move == same and not move != same and hash(move) == hash(same)
+	assert len(set([move, same, Move('star', 112, 1, ['a', 'blank', 's', 't'])])) == 2
+	assert move != ('star', 112, 0, ['a', 'blank', 's', 't'])
+	assert list(move) == ['star', 112, 0, ['a', 'blank', 's', 't']]
+	w, t, d, l = move
+	l.append('x')
+	assert move.letters_used == ('a', 'blank', 's', 't')
+	for name in ('word', 'letters_used', 'other'):
+		try:
+			setattr(move, name, None)
+			assert False, name
+		except AttributeError:
+			pass
+	assert pickle.loads(pickle.dumps(move)) == move
+	assert pickle.loads(pickle.dumps(move, 2)) == move
+
+# placements of a game are distinct moves, and the optimal words keep their tuple format
+def move_placements():
+	scrabble = Scrabble(2, CONFIG_FILE, WORD_DICT, seed=4)
+	for turn in range(0, 3):
+		rack = scrabble.player_data[scrabble.player]['rack']
+		moves = list(scrabble._getPlacements(rack, MoveGenerator(scrabble)))
+		assert moves and all(isinstance(move, Move) for move in moves)
+		assert len(set(moves)) == len(moves)
+		opt = scrabble.getOptimalMove()
+		for w, t, d, l in opt['words']:
+			assert isinstance(t, str) and isinstance(l, list) and l == sorted(l)
+			assert Move(w, scrabble.board.getIndex(t), d, l) in set(moves)
+		playBest(scrabble)
+
+if __name__ == '__main__':
+	move_hashable()
+	move_placements()
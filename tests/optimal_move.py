@@ -3,6 +3,8 @@ import sys
 import ConfigParser
 sys.path.append('../bin')
 from scrabble import Scrabble
+from move import Move
+import verify
 CONFIG_FILE = './test_config/optimal_move.conf'
 WORD_DICT = './test_config/optimal_move'
 
@@ -12,6 +14,10 @@ config.read(CONFIG_FILE)
 # setup config and dictionary for each test suite
 # grabs next optimal move and returns
 def setup(words_in_play, letters_in_hand, word_list):
+	return setupGame(words_in_play, letters_in_hand, word_list).getOptimalMove()
+
+# setup config and dictionary, returns the game
+def setupGame(words_in_play, letters_in_hand, word_list):
 	# setup words_in_play and tiles_in_hand
 	config.set('init', 'words_in_play', words_in_play)
 	config.set('letters_in_hand', 'player0', letters_in_hand)
@@ -21,8 +27,7 @@ def setup(words_in_play, letters_in_hand, word_list):
 	with open(WORD_DICT, 'w') as word_dict:
 		for word in word_list:
 			word_dict.write(word+'\n')
-	scrabble = Scrabble(1, CONFIG_FILE, WORD_DICT)
-	return scrabble.getOptimalMove()
+	return Scrabble(1, CONFIG_FILE, WORD_DICT)
 
 # empty board, with an empty dictionary
 # should return 0 points
@@ -62,6 +67,15 @@ def empty_twoBlanks():
 	assert opt['points'] == 22, opt['points']
 	assert len(opt['words']) == 2, len(opt['words'])
 
+# empty board, 'coffee' with a 'blank' for one of its letters
+# the blank goes on the cheapest square, so placing each optimal word scores the same points
+def empty_blankPlacedScore():
+	opt = setup('', 'blank/c/o/f/e/e', ['coffee'])
+	assert opt['points'] == 26, opt['points']
+	for w, t, d, l in opt['words']:
+		scrabble = setupGame('', 'blank/c/o/f/e/e', ['coffee'])
+		assert scrabble.placeWord(w, t, d) == opt['points'], (t, d)
+
 # empty board, creating word 'testers'
 # should return word score and 50 point bonus
 def empty_sevenLetterBonus():
@@ -188,6 +202,54 @@ def two_startOneEndSecondBlankLast():
 	opt = setup('animal;0-1;across/tar;4-8;across', 's/t/a/r/blank', ['animals', 'star', 'stars'])
 	assert opt['points'] == 45, opt['points']
 
+# one word on the board 'no'
+# parallel play 'on' above or below forms side words 'on' and 'no' without using a board letter
+def one_parallelPlay():
+	opt = setup('no;7-7;across', 'o/n', ['no', 'on'])
+	assert opt['points'] == 8, opt['points']
+	assert len(opt['words']) == 2, len(opt['words'])
+
+
+# one word in play, top moves streamed best first
+# first moves are the optimal ones, in the same order
+def top_bestFirst():
+	scrabble = setupGame('no;7-7;across', 'o/n/t/blank', ['no', 'on', 'not', 'ton', 'onto', 'snot'])
+	opt = scrabble.getOptimalMove()
+	moves = list(scrabble.iterMoves())
+	top = scrabble.getTopMoves(len(moves) + 5)
+	assert len(top) == len(moves), len(top)
+	points = [p for p, w, t, d, l in top]
+	assert points == sorted(points, reverse=True), points
+	best = [(w, t, d, l) for p, w, t, d, l in top if p == opt['points']]
+	assert best == opt['words'], best
+	assert scrabble.getTopMoves(3) == top[:3]
+	assert scrabble.getTopMoves(0) == []
+
+# one word in play, only moves scoring at least threshold
+def top_threshold():
+	scrabble = setupGame('no;7-7;across', 'o/n/t/blank', ['no', 'on', 'not', 'ton', 'onto', 'snot'])
+	moves = list(scrabble.iterMoves())
+	above = [m for m in moves if m[0] >= 5]
+	assert above and len(above) < len(moves), len(above)
+	assert list(scrabble.iterMoves(5)) == above
+	assert scrabble.getTopMoves(100, 5) == scrabble.getTopMoves(len(above))
+
+# empty board, every move streamed: each word across and down at every offset covering the center
+def top_emptyBoard():
+	word_list = ['anion', 'nine', 'eon', 'no', 'on']
+	scrabble = setupGame('', 'a/a/e/i/n/n/o', word_list)
+	rack = scrabble.player_data[scrabble.player]['rack']
+	moves = list(scrabble.iterMoves())
+	found = [Move(w, scrabble.board.getIndex(t), d, l) for p, w, t, d, l in moves]
+	assert len(set(found)) == len(found)
+	assert set(found) == set(verify.iterLegalMoves(scrabble, rack)), len(found)
+	assert set(d for p, w, t, d, l in moves) == set(['across', 'down'])
+	for p, w, t, d, l in moves:
+		assert setupGame('', 'a/a/e/i/n/n/o', word_list).placeWord(w, t, d) == p, (w, t, d)
+	opt = scrabble.getOptimalMove()
+	top = scrabble.getTopMoves(len(moves))
+	assert len(top) == len(moves) and top[0][0] == opt['points']
+	assert list(scrabble.iterMoves(opt['points'])) == [m for m in moves if m[0] == opt['points']]
 
 if __name__ == '__main__':
 	empty_noPossibleWords()
@@ -195,6 +257,7 @@ if __name__ == '__main__':
 	empty_sixLetterWord()
 	empty_oneBlank()
 	empty_twoBlanks()
+	empty_blankPlacedScore()
 	empty_sevenLetterBonus()
 	boundary_start()
 	boundary_end()
@@ -208,6 +271,7 @@ if __name__ == '__main__':
 	one_blankTileLast()
 	one_doubleWordAtStart()
 	one_doubleWordAtEnd()
+	one_parallelPlay()
 	two_invalidIntersect()
 	two_validIntersect()
 	two_intersectBoth()
@@ -217,4 +281,6 @@ if __name__ == '__main__':
 	two_startOneEndSecond()
 	two_startOneEndSecondBlankFirst()
 	two_startOneEndSecondBlankLast()
-
+	top_bestFirst()
+	top_threshold()
+	top_emptyBoard()
@@ -0,0 +1,35 @@
+import sys
+import random
+sys.path.append('../bin')
+from scrabble import Scrabble
+from game_setup import playBest
+from parallel import MovePool
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# play the first optimal word of each turn, checking the pool finds the same moves as the serial search
+def pool_matchesSerial():
+	random.seed(9)
+	scrabble = Scrabble(2, CONFIG_FILE, WORD_DICT)
+	pool = MovePool(scrabble.rules, 2)
+	try:
+		for turn in range(0, 6):
+			opt = scrabble.getOptimalMove()
+			assert pool.getOptimalMove(scrabble) == opt, turn
+			assert playBest(scrabble) == opt['points'], turn
+	finally:
+		pool.close()
+
+# games under other rules are refused
+def pool_otherRules():
+	scrabble = Scrabble(1, './test_config/optimal_move.conf', './test_config/optimal_move')
+	with MovePool(Scrabble(1, CONFIG_FILE, WORD_DICT).rules, 1) as pool:
+		try:
+			pool.getOptimalMove(scrabble)
+			assert False
+		except ValueError:
+			pass
+
+if __name__ == '__main__':
+	pool_matchesSerial()
+	pool_otherRules()
@@ -0,0 +1,41 @@
+import sys
+sys.path.append('../bin')
+from rack import Rack, TILE_INDEX, BLANK
+
+# blanks only cover letters missing from the rack
+def lettersUsed_blanks():
+	rack = Rack(['s', 't', 'blank', 'blank'])
+	assert rack.lettersUsed(['s', 's', 't']) == ['blank', 's', 't'], rack.lettersUsed(['s', 's', 't'])
+	assert rack.lettersUsed(['x', 't']) == ['blank', 't']
+	assert rack.lettersUsed(['x', 'y', 'z']) == False
+	assert rack.lettersUsed(['a', 'b', 'c', 'd', 'e']) == False
+	assert rack.lettersUsed([]) == []
+
+# racks with the same tiles share a signature, whatever the order
+def signature_order():
+	a = Rack(['a', 'b', 'blank'])
+	b = Rack(['blank', 'a', 'b'])
+	assert a.signature == b.signature
+	b.add('a')
+	assert a.signature != b.signature
+	b.remove('a')
+	assert a.signature == b.signature
+
+# take and put undo each other
+def takePut_undo():
+	rack = Rack(['q', 'u', 'blank'])
+	signature = rack.signature
+	rack.take(TILE_INDEX['q'])
+	rack.take(BLANK)
+	assert not rack.canPlay('q')
+	assert len(rack) == 1
+	rack.put(BLANK)
+	rack.put(TILE_INDEX['q'])
+	assert rack.signature == signature
+	assert rack.letters() == ['q', 'u', 'blank'], rack.letters()
+
+
+if __name__ == '__main__':
+	lettersUsed_blanks()
+	signature_order()
+	takePut_undo()
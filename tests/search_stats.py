@@ -0,0 +1,74 @@
+import sys
+import pstats
+import StringIO
+sys.path.append('../bin')
+from scrabble import Scrabble
+from game_setup import playGreedy
+from stats import SearchStats
+from parallel import MovePool
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# returns a game a few moves in
+def setupGame(seed):
+	return playGreedy(Scrabble(2, CONFIG_FILE, WORD_DICT, seed=seed), 4)
+
+# a search with stats finds the same move, and counts its work and rejections
+def stats_counted():
+	scrabble = setupGame(2)
+	opt = scrabble.getOptimalMove()
+	scrabble.rules.move_cache.clear()
+	stats = SearchStats()
+	assert scrabble.getOptimalMove(stats=stats) == opt
+	assert scrabble.stats is None
+	counters = stats.counters
+	assert counters['anchors'] > 0 and counters['candidates'] >= counters['scored'] > 0
+	assert counters['side_word_lookups'] >= stats.rejected.get('side_word', 0) > 0
+	for phase in ('generate', 'optimize', 'score', 'total'):
+		assert phase in stats.phases, phase
+	assert stats.phases['total'] >= stats.phases['score']
+	# the next call is answered by the move cache
+	cached = SearchStats()
+	scrabble.getOptimalMove(stats=cached)
+	assert cached.counters == {'cache_hits': 1}
+	assert 'anchors' in stats.asDict()['counters'] and str(stats)
+
+# searches across a pool count the work of every worker
+def stats_pool():
+	scrabble = setupGame(2)
+	scrabble.rules.move_cache.clear()
+	serial = SearchStats()
+	opt = scrabble.getOptimalMove(stats=serial)
+	scrabble.rules.move_cache.clear()
+	stats = SearchStats()
+	with MovePool(scrabble.rules, 2) as pool:
+		assert scrabble.getOptimalMove(pool, stats) == opt
+	assert stats.counters['anchors'] == serial.counters['anchors']
+	assert stats.counters['scored'] > 0 and stats.counters['side_word_lookups'] > 0
+	for phase in ('generate', 'optimize', 'score', 'total'):
+		assert phase in stats.phases, phase
+
+# opening searches count words that cannot be made or placed
+def stats_opening():
+	scrabble = Scrabble(1, CONFIG_FILE, WORD_DICT, seed=3)
+	stats = SearchStats()
+	scrabble.getOptimalMove(stats=stats)
+	assert stats.counters['scored'] > 0
+	assert 'anchors' not in stats.counters
+
+# the profiler and trace hooks see the search
+def stats_hooks():
+	scrabble = setupGame(5)
+	events = []
+	stats = SearchStats(profile=True, trace=lambda event, name, n: events.append((event, name)))
+	scrabble.getOptimalMove(stats=stats)
+	output = StringIO.StringIO()
+	pstats.Stats(stats.profile, stream=output).print_stats('_extendRight')
+	assert '_extendRight' in output.getvalue()
+	assert ('count', 'anchors') in events and ('time', 'total') in events
+
+if __name__ == '__main__':
+	stats_counted()
+	stats_pool()
+	stats_opening()
+	stats_hooks()
@@ -0,0 +1,60 @@
+import sys
+import json
+import StringIO
+sys.path.append('../bin')
+from scrabble import Scrabble
+from rack import Rack
+from selfplay import Tournament, playGame
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# games end, and are replayed exactly from their seed
+def game_reproducible():
+	rules = Scrabble(1, CONFIG_FILE, WORD_DICT).rules
+	first = playGame(['greedy', 'random'], 3, rules, CONFIG_FILE)
+	second = playGame(['greedy', 'random'], 3, rules, CONFIG_FILE)
+	for result in (first, second):
+		del result['seconds']
+		for move in result['moves']: del move['seconds']
+	assert first == second
+	assert first['turns'] == len(first['moves'])
+	assert first['strategies'] == {'player0': 'greedy', 'player1': 'random'}
+
+# scoreless turns end the game, tiles left in hand are taken off
+def game_scorelessLimit():
+	scrabble = Scrabble(2, CONFIG_FILE, WORD_DICT)
+	for turn in range(0, 6):
+		assert not scrabble.isGameOver()
+		scrabble.passTurn()
+	assert scrabble.isGameOver()
+	scores = scrabble.getFinalScores()
+	for player in scrabble.player_list:
+		rack = scrabble.player_data[player]['rack']
+		assert scores[player] == -sum(scrabble.letters_points[l] for l in rack.letters())
+
+# a player going out with the bag empty ends the game and gets the points left in other hands
+def game_playedOut():
+	scrabble = Scrabble(2, CONFIG_FILE, WORD_DICT)
+	scrabble.bag.remove(scrabble.bag.letters())
+	scrabble.player_data['player0']['rack'] = Rack()
+	assert scrabble.isGameOver()
+	left = sum(scrabble.letters_points[l] for l in scrabble.player_data['player1']['rack'].letters())
+	scores = scrabble.getFinalScores()
+	assert scores['player0'] == left
+	assert scores['player1'] == -left
+
+# every game is written as one JSON line, in game order, with seats rotating
+def tournament_output():
+	output = StringIO.StringIO()
+	summary = Tournament(['greedy', 'random'], 3, seed=10, processes=2, config_file=CONFIG_FILE, dictionary_file=WORD_DICT).run(output)
+	results = [json.loads(line) for line in output.getvalue().splitlines()]
+	assert [r['seed'] for r in results] == [10, 11, 12]
+	assert results[0]['strategies']['player0'] == 'greedy'
+	assert results[1]['strategies']['player0'] == 'random'
+	assert summary['greedy']['games'] == 3 and summary['random']['games'] == 3
+
+if __name__ == '__main__':
+	game_reproducible()
+	game_scorelessLimit()
+	game_playedOut()
+	tournament_output()
@@ -0,0 +1,54 @@
+import sys
+sys.path.append('../bin')
+from scrabble import Scrabble
+from game_setup import playGreedy
+from parallel import MovePool
+from simulate import Simulator, getLeaveValue
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# returns a two player game a few moves in
+def setupGame(seed):
+	return playGreedy(Scrabble(2, CONFIG_FILE, WORD_DICT, seed=seed), 4)
+
+# same seed, same equities; the game itself is left untouched
+def simulate_reproducible():
+	scrabble = setupGame(2)
+	board = str(scrabble.board.letters)
+	letters = scrabble.getLetters()
+	bag = scrabble.bag.snapshot()
+	first = Simulator(scrabble, 4, seed=7).simulate(iterations=3)
+	second = Simulator(scrabble, 4, seed=7).simulate(iterations=3)
+	assert first == second
+	assert len(first) == 4
+	assert all(samples == 3 for equity, move, samples in first)
+	assert [equity for equity, move, samples in first] == sorted([equity for equity, move, samples in first], reverse=True)
+	assert str(scrabble.board.letters) == board
+	assert scrabble.getLetters() == letters
+	assert scrabble.bag.snapshot() == bag
+
+# a spent time budget still runs one round
+def simulate_timeLimit():
+	scrabble = setupGame(4)
+	results = Simulator(scrabble, 2, seed=1).simulate(time_limit=0)
+	assert results and all(samples == 1 for equity, move, samples in results)
+
+# playouts across a pool give the same equities
+def simulate_pool():
+	scrabble = setupGame(11)
+	serial = Simulator(scrabble, 3, seed=2).simulate(iterations=2)
+	assert len(serial) == 3
+	with MovePool(scrabble.rules, 2) as pool:
+		assert Simulator(scrabble, 3, seed=2, pool=pool).simulate(iterations=2) == serial
+
+# duplicates cost, blanks are worth keeping
+def leave_values():
+	assert getLeaveValue([]) == 0
+	assert getLeaveValue(['blank']) > getLeaveValue(['s']) > getLeaveValue(['q'])
+	assert getLeaveValue(['e', 'e']) < 2 * getLeaveValue(['e'])
+
+if __name__ == '__main__':
+	simulate_reproducible()
+	simulate_timeLimit()
+	simulate_pool()
+	leave_values()
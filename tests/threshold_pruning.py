@@ -0,0 +1,52 @@
+import sys
+import random
+sys.path.append('../bin')
+from scrabble import Scrabble
+from rack import Rack
+from game_setup import playGreedy
+import verify
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# returns random mid-game positions: games played greedily for a few turns, the player to move holding a
+# random rack, every other one without blanks (a blank scores less than its face value, so ties with one
+# cannot show a bound cutting ties)
+def getPositions(count, seed):
+	rng = random.Random(seed)
+	rules = Scrabble(1, CONFIG_FILE, WORD_DICT).rules
+	positions = []
+	while len(positions) < count:
+		scrabble = playGreedy(Scrabble(2, rules=rules, seed=rng.getrandbits(32)), rng.randint(1, 8))
+		# openings are answered from the anagram index, without the move generator
+		if not scrabble.board.tile_count:
+			continue
+		rack = verify.getRandomRack(rules, rng)
+		if len(positions) % 2:
+			rack = Rack(['e' if l == 'blank' else l for l in rack.letters()])
+		scrabble.player_data[scrabble.player]['rack'] = rack
+		positions.append(scrabble)
+	return positions
+
+# the pruned search finds the optimal points and words of the unpruned maximum over every move, in search order
+def pruning_matchesUnpruned():
+	ties = 0
+	for scrabble in getPositions(30, 7):
+		moves = list(scrabble.iterMoves())
+		best = max([0] + [m[0] for m in moves])
+		opt = scrabble._searchOptimalMove()
+		assert opt['points'] == best, (opt['points'], best)
+		assert opt['words'] == [m[1:] for m in moves if m[0] == best]
+		if len(opt['words']) > 1 and not any('blank' in l for w, t, d, l in opt['words']): ties += 1
+	# placements tying the best points found so far must not be cut
+	assert ties, ties
+
+# top moves with a rising threshold are the highest of every move
+def pruning_topMoves():
+	for scrabble in getPositions(8, 11):
+		points = sorted((m[0] for m in scrabble.iterMoves()), reverse=True)
+		for n in (1, 5, 20):
+			assert [m[0] for m in scrabble.getTopMoves(n)] == points[:n], n
+
+if __name__ == '__main__':
+	pruning_matchesUnpruned()
+	pruning_topMoves()
@@ -0,0 +1,63 @@
+import sys
+sys.path.append('../bin')
+from bag import Bag
+from scrabble import Scrabble
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# draws follow the seed, and empty the bag
+def bag_seeded():
+	counts = {'a': 3, 'b': 1, 'blank': 2}
+	first = Bag.fromCounts(counts, 5)
+	second = Bag.fromCounts(counts, 5)
+	drawn = [first.draw() for i in range(0, 6)]
+	assert drawn == [second.draw() for i in range(0, 6)]
+	assert sorted(drawn) == ['a', 'a', 'a', 'b', 'blank', 'blank']
+	assert len(first) == 0 and first.draw() is None
+
+# letters come out in proportion to their copies left
+def bag_weighted():
+	draws = {'a': 0, 'b': 0}
+	for seed in range(0, 2000):
+		draws[Bag(['a'] * 9 + ['b'], seed).draw()] += 1
+	assert 1600 < draws['a'] < 1990, draws
+
+# tiles put back are drawn again, counts follow
+def bag_insert():
+	bag = Bag(['a'], 1)
+	assert bag.draw() == 'a'
+	bag.insert(['z', 'z'])
+	assert bag.count('z') == 2 and len(bag) == 2
+	bag.remove(['z'])
+	assert bag.letters() == ['z']
+	try:
+		bag.remove(['q'])
+		assert False
+	except ValueError:
+		pass
+
+# draws after a restore repeat the draws after the snapshot
+def bag_restore():
+	bag = Bag.fromCounts({'a': 4, 'e': 4, 's': 2}, 3)
+	snapshot = bag.snapshot()
+	drawn = [bag.draw() for i in range(0, 5)]
+	bag.restore(snapshot)
+	assert [bag.draw() for i in range(0, 5)] == drawn
+	assert len(bag) == 5
+
+# games with the same seed deal the same racks
+def game_seeded():
+	first = Scrabble(2, CONFIG_FILE, WORD_DICT, seed=8)
+	second = Scrabble(2, CONFIG_FILE, WORD_DICT, seed=8)
+	for player in first.player_list:
+		assert first.player_data[player]['rack'].letters() == second.player_data[player]['rack'].letters()
+	assert len(first.bag) == first.rules.letters_total - 14
+	assert first.exchangeTiles(first.getLetters()[:3])
+	assert len(first.bag) == first.rules.letters_total - 14
+
+if __name__ == '__main__':
+	bag_seeded()
+	bag_weighted()
+	bag_insert()
+	bag_restore()
+	game_seeded()
@@ -0,0 +1,55 @@
+import sys
+sys.path.append('../bin')
+from scrabble import Scrabble
+from game_setup import playBest
+from board import ACROSS, DOWN
+CONFIG_FILE = '../config/scrabble.conf'
+WORD_DICT = '../config/basic_english_word_list'
+
+# returns everything a move can change
+def getState(scrabble):
+	board = scrabble.board
+	cross_checks = scrabble.cross_checks
+	state = {}
+	state['board'] = (str(board.letters), board.points.tostring(), board.tile_count, board.hash)
+	state['cross_checks'] = (list(cross_checks.allowed[ACROSS]), list(cross_checks.allowed[DOWN]), list(cross_checks.side_points[ACROSS]), list(cross_checks.side_points[DOWN]), str(cross_checks.anchors))
+	state['players'] = [(p, scrabble.player_data[p]['score'], scrabble.player_data[p]['rack'].letters()) for p in scrabble.player_list]
+	state['bag'] = scrabble.bag.snapshot()
+	state['turn'] = (scrabble.player, scrabble.player_index, scrabble.scoreless_turns)
+	return state
+
+# optimal moves applied one after the other are taken back in reverse order
+def undo_restoresState():
+	scrabble = Scrabble(2, CONFIG_FILE, WORD_DICT, seed=4)
+	states = []
+	for turn in range(0, 5):
+		states.append(getState(scrabble))
+		assert playBest(scrabble, True) is not False
+	assert scrabble.board.tile_count
+	while states:
+		scrabble.undoMove()
+		assert getState(scrabble) == states.pop()
+	assert not scrabble.moves_applied
+
+# a move taken back and played again draws the same tiles and reaches the same state
+def undo_replays():
+	scrabble = Scrabble(2, CONFIG_FILE, WORD_DICT, seed=6)
+	w, t, d, l = scrabble.getOptimalMove()['words'][0]
+	points = scrabble.applyMove(w, t, d)
+	after = getState(scrabble)
+	scrabble.undoMove()
+	assert scrabble.applyMove(w, t, d) == points
+	assert getState(scrabble) == after
+
+# a move that cannot be placed is not recorded
+def undo_invalidMove():
+	scrabble = Scrabble(1, CONFIG_FILE, WORD_DICT, seed=1)
+	before = getState(scrabble)
+	assert scrabble.applyMove('zzzz', '7-7', ACROSS) is False
+	assert not scrabble.moves_applied
+	assert getState(scrabble) == before
+
+if __name__ == '__main__':
+	undo_restoresState()
+	undo_replays()
+	undo_invalidMove()